@@ -7,28 +7,90 @@ Improved tracking using template matching and color-based detection.
 import cv2
 import numpy as np
 import mss
+import os
 from typing import List, Tuple, Optional, Dict
-from collections import deque
+
+from numba_compat import njit
+from screen_capture import (FrameGrabber, bgra_to_bgr, blend, blit_text,
+                            make_capture_backend, roi_around)
+
+
+@njit(cache=True)
+def _push_centers(traj: np.ndarray, slot: int, boxes: np.ndarray):
+    """Write the center of each (x, y, w, h) row of ``boxes`` into ring-buffer ``slot``."""
+    for i in range(boxes.shape[0]):
+        traj[i, slot, 0] = boxes[i, 0] + boxes[i, 2] // 2
+        traj[i, slot, 1] = boxes[i, 1] + boxes[i, 3] // 2
 
 
 class AdvancedCupTracker:
     """Advanced cup tracking with template matching and color detection."""
     
+    DETECT_SCALE = 2  # Detection runs on a pyrDown'd frame
+    DISPLAY_MAX_HEIGHT = 720  # Taller frames are shown at half size
+    LIVE_FPS = 60  # Target rate of the background capture thread
+    
     def __init__(self, screen_region: Optional[Dict] = None):
         """Initialize the advanced tracker."""
         self.screen_region = screen_region
         self.sct = None  # Lazy initialization
+        self._hud = None  # Pre-rendered instructions strip
+        self._hud_alpha = None
+        
+        # Per-frame scratch buffers, allocated on first use and reused afterwards
+        self._small = None
+        self._hsv = None
+        self._value = None
+        self._mask = None
+        self._mask_tmp = None
+        self._gray = None
+        self._gray_prev = None
+        self._display = None
         
         # Tracking state
         self.cup_templates = []
         self.cup_positions = []
         self.ball_cup_index = None
-        self.prev_frame = None
         
-        # Tracking history
-        self.position_history = {0: deque(maxlen=50), 1: deque(maxlen=50), 2: deque(maxlen=50)}
+        # Tracking history: ring buffer of cup centers, shape (cup, slot, xy)
+        self.history_length = 50
+        self._traj = np.zeros((3, self.history_length, 2), dtype=np.int32)
+        self._traj_written = 0  # Centers written so far (same count for every cup)
         self.frame_count = 0
         
+        # Static-scene detection: thumbnail of the last processed frame and the
+        # largest per-cell absolute difference below which a frame is considered
+        # unchanged (a mean over the whole thumbnail hides small cups moving)
+        self._thumb_ref = None
+        self.static_threshold = 2.0
+        
+        # Re-detection is triggered when optical flow reports a cup moving faster
+        # than this many pixels per frame (LK drifts on fast shuffles)
+        self.redetect_motion = 8.0
+        self.last_motion = 0.0
+        # Slow periodic re-detection, as a fallback for gradual LK drift
+        self.redetect_interval = 30
+        self._last_detect_frame = 0  # frame_count of the last color detection
+        
+        # Work area: (x0, y0, x1, y1) around the known cups, None for the whole frame
+        self._roi = None
+        self.roi_margin = 30
+        
+        self._grabber = None  # Background capture thread (see start_capture_thread)
+        self._backend = None  # Capture backend of capture_frame, created on first use
+        self._bgr = None  # Reused BGR buffer of capture_frame
+        
+        # Small ROIs gain nothing from a large OpenCV pool; cap it to avoid oversubscription
+        cv2.setNumThreads(max(1, min(4, (os.cpu_count() or 1) // 2)))
+        cv2.setUseOptimized(True)
+        
+        # Horizontal/vertical structuring elements for separable morphology
+        self._morph_kernels = {
+            size: (cv2.getStructuringElement(cv2.MORPH_RECT, (size, 1)),
+                   cv2.getStructuringElement(cv2.MORPH_RECT, (1, size)))
+            for size in (5, 9)
+        }
+        
         # Colors for visualization
         self.colors = [(0, 255, 0), (255, 0, 0), (0, 0, 255)]
         
@@ -58,100 +120,213 @@ class AdvancedCupTracker:
         return None
     
     def capture_frame(self) -> np.ndarray:
-        """Capture frame from screen region."""
+        """Capture frame from screen region (buffer is reused between calls)."""
         if self.screen_region is None:
             self.screen_region = self.select_screen_region()
             if self.screen_region is None:
                 raise ValueError("No region selected")
         
-        # Initialize mss if not already done
-        if self.sct is None:
-            self.sct = mss.mss()
+        if self._backend is None:
+            self._backend = make_capture_backend(self.screen_region, self.LIVE_FPS)
+        self._bgr = bgra_to_bgr(self._backend.grab(), self._bgr)
+        return self._bgr
+    
+    def start_capture_thread(self):
+        """Grab frames on a background thread so capture overlaps detection."""
+        if self._grabber is not None:
+            return
+        
+        if self.screen_region is None:
+            self.screen_region = self.select_screen_region()
+            if self.screen_region is None:
+                raise ValueError("No region selected")
         
-        screenshot = self.sct.grab(self.screen_region)
-        frame = np.array(screenshot)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-        return frame
+        self._grabber = FrameGrabber(self.screen_region, self.LIVE_FPS)
+        self._grabber.start()
+    
+    def stop_capture_thread(self):
+        """Stop the background capture thread, if running."""
+        if self._grabber is None:
+            return
+        
+        self._grabber.stop()
+        self._grabber = None
+    
+    def read_latest_frame(self, timeout: float = 1.0) -> np.ndarray:
+        """Return the newest frame from the capture thread (buffer is reused between calls)."""
+        if self._grabber is None:
+            raise RuntimeError("Capture thread is not running")
+        return self._grabber.read(timeout)
+    
+    def _scratch(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """Return a ``shape`` view of the reusable uint8 buffer ``self.<name>``, growing it when needed."""
+        buf = getattr(self, name)
+        if buf is None or buf.ndim != len(shape) or any(b < s for b, s in zip(buf.shape, shape)):
+            # Grow only, so ROIs of varying size keep sharing one allocation
+            grown = shape if buf is None or buf.ndim != len(shape) else np.maximum(buf.shape, shape)
+            buf = np.empty(tuple(int(s) for s in grown), dtype=np.uint8)
+            setattr(self, name, buf)
+        return buf[tuple(slice(0, s) for s in shape)]
     
     def detect_cups_color(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
         Detect cups using color-based segmentation.
         Assumes cups are distinct from background.
+        Only the work area around the known cups is segmented; the whole frame
+        is used when there is none or it does not contain all 3 cups.
         """
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        self._last_detect_frame = self.frame_count
+        if self._roi is not None:
+            x0, y0, x1, y1 = self._roi
+            cups = self._segment_cups(frame[y0:y1, x0:x1], x0, y0)
+            if len(cups) == 3:
+                return cups
+        
+        return self._segment_cups(frame, 0, 0)
+    
+    def _segment_cups(self, frame: np.ndarray, x0: int, y0: int) -> List[Tuple[int, int, int, int]]:
+        """Segment cups in ``frame``, a crop whose top-left corner sits at (x0, y0)."""
+        # Segment at reduced resolution: cups stay well above the size limits and
+        # every following pass touches 4x fewer pixels
+        h, w = frame.shape[:2]
+        small = cv2.pyrDown(frame, dst=self._scratch("_small", ((h + 1) // 2, (w + 1) // 2, 3)))
+        scale = self.DETECT_SCALE
+        
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV, dst=self._scratch("_hsv", small.shape))
         
         # Create mask for potential cup colors (adjust based on actual cup colors)
-        # This is a general approach - may need tuning
-        lower_bound = np.array([0, 0, 50])
-        upper_bound = np.array([180, 255, 255])
-        mask = cv2.inRange(hsv, lower_bound, upper_bound)
-        
-        # Morphological operations
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        
-        # Find contours
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        cups = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 1000:  # Minimum area
-                x, y, w, h = cv2.boundingRect(contour)
-                if w > 30 and h > 30:  # Minimum dimensions
-                    cups.append((x, y, w, h))
-        
-        # Sort and limit to 3 cups
-        cups = sorted(cups, key=lambda c: c[0])
-        if len(cups) > 3:
-            cups = sorted(cups, key=lambda c: c[2] * c[3], reverse=True)[:3]
-            cups = sorted(cups, key=lambda c: c[0])
-        
-        return cups
+        # This is a general approach - may need tuning. The [0,0,50]-[180,255,255]
+        # range only constrains brightness, so compare the V plane alone.
+        value = cv2.extractChannel(hsv, 2, dst=self._scratch("_value", small.shape[:2]))
+        mask = cv2.compare(value, 50, cv2.CMP_GE, dst=self._scratch("_mask", small.shape[:2]))
+        
+        # Morphological close then open with a 5x5 square, done as separable 1-D
+        # passes; the close's erosion and the open's erosion fuse into one 9-wide pass.
+        # Passes ping-pong between the mask and a scratch buffer.
+        tmp = self._scratch("_mask_tmp", small.shape[:2])
+        kernel_h5, kernel_v5 = self._morph_kernels[5]
+        kernel_h9, kernel_v9 = self._morph_kernels[9]
+        cv2.dilate(mask, kernel_h5, dst=tmp)
+        cv2.dilate(tmp, kernel_v5, dst=mask)
+        cv2.erode(mask, kernel_h9, dst=tmp)
+        cv2.erode(tmp, kernel_v9, dst=mask)
+        cv2.dilate(mask, kernel_h5, dst=tmp)
+        cv2.dilate(tmp, kernel_v5, dst=mask)
+        
+        # Label the blobs in a single native pass
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8, ltype=cv2.CV_32S)
+        stats = stats[1:]  # Row 0 is the background
+        
+        areas = stats[:, cv2.CC_STAT_AREA]
+        keep = np.flatnonzero((areas > 1000 / scale ** 2) &  # Minimum area
+                              (stats[:, cv2.CC_STAT_WIDTH] > 30 / scale) &  # Minimum dimensions
+                              (stats[:, cv2.CC_STAT_HEIGHT] > 30 / scale))
+        
+        # Limit to the 3 largest cups, then sort left to right
+        if keep.size > 3:
+            keep = keep[np.argpartition(-areas[keep], 3)[:3]]
+        keep = keep[np.argsort(stats[keep, cv2.CC_STAT_LEFT], kind="stable")]
+        
+        boxes = stats[keep, :4] * scale  # LEFT, TOP, WIDTH, HEIGHT in crop coordinates
+        boxes[:, 0] += x0
+        boxes[:, 1] += y0
+        
+        return [tuple(box) for box in boxes.tolist()]
     
     def track_with_optical_flow(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
         Track cups using optical flow between frames.
         """
-        if self.prev_frame is None or len(self.cup_positions) == 0:
+        # Convert to grayscale; the previous frame's grayscale is kept from the last step
+        gray_curr = self._advance_gray(frame)
+        gray_prev = self._gray_prev
+        h, w = gray_curr.shape
+        if gray_prev is not None:
+            gray_prev = gray_prev[:h, :w]
+        
+        if gray_prev is None or gray_prev.shape != gray_curr.shape or len(self.cup_positions) == 0:
+            self.last_motion = 0.0
             return self.detect_cups_color(frame)
         
-        # Convert to grayscale
-        gray_prev = cv2.cvtColor(self.prev_frame, cv2.COLOR_BGR2GRAY)
-        gray_curr = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Track all cup centers with a single pyramidal LK call. Between consecutive
+        # frames cup centers move slowly, so a small window, one pyramid level and a
+        # fixed iteration count suffice. With static-frame skipping on, the previous
+        # gray frame is the last *processed* one and motion can build up across
+        # skipped frames, so the wider, deeper search is kept.
+        # The pyramids are only built for the work area around the cups.
+        if self.static_threshold > 0:
+            win_size, max_level = (15, 15), 2
+        else:
+            win_size, max_level = (9, 9), 1
+        x0, y0, x1, y1 = self._roi if self._roi is not None else (0, 0, w, h)
+        boxes = np.array(self.cup_positions, dtype=np.int32)
+        sizes = boxes[:, 2:]
+        origin = np.array([x0, y0], dtype=np.int32)
+        centers = (boxes[:, :2] + sizes // 2 - origin).astype(np.float32).reshape(-1, 1, 2)
         
-        # Calculate optical flow for cup centers
-        updated_positions = []
+        new_centers, status, _ = cv2.calcOpticalFlowPyrLK(
+            gray_prev[y0:y1, x0:x1], gray_curr[y0:y1, x0:x1], centers, None,
+            winSize=win_size,
+            maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_COUNT, 7, 0)
+        )
         
-        for x, y, w, h in self.cup_positions:
-            # Get center point
-            center = np.array([[[x + w // 2, y + h // 2]]], dtype=np.float32)
-            
-            # Calculate optical flow
-            new_center, status, _ = cv2.calcOpticalFlowPyrLK(
-                gray_prev, gray_curr, center, None,
-                winSize=(15, 15),
-                maxLevel=2,
-                criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
-            )
-            
-            if status[0][0] == 1:
-                new_x = int(new_center[0][0][0] - w // 2)
-                new_y = int(new_center[0][0][1] - h // 2)
-                updated_positions.append((new_x, new_y, w, h))
-            else:
-                updated_positions.append((x, y, w, h))
+        # A lost cup means the work area is stale: re-detect on the whole frame
+        tracked = status.reshape(-1) == 1
+        if not tracked.all():
+            self._roi = None
+            self.last_motion = 0.0
+            return self.detect_cups_color(frame)
+        
+        displacement = np.linalg.norm(new_centers - centers, axis=-1).reshape(-1)
+        self.last_motion = float(displacement.max()) if displacement.size else 0.0
+        boxes[:, :2] = new_centers.reshape(-1, 2).astype(np.int32) + origin - sizes // 2
+        updated_positions = [tuple(box) for box in boxes.tolist()]
         
         return updated_positions
     
+    def _advance_gray(self, frame: np.ndarray) -> np.ndarray:
+        """Convert ``frame`` to grayscale, keeping the previous result as ``self._gray_prev``."""
+        self._gray, self._gray_prev = self._gray_prev, self._gray
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._scratch("_gray", frame.shape[:2]))
+    
+    def _scene_changed(self, frame: np.ndarray) -> bool:
+        """
+        Cheap change test against the last processed frame using 32x32 thumbnails.
+        Each thumbnail cell averages one block of the frame, and the frame counts as
+        changed when any block does, so a single cup moving a few pixels is caught.
+        The reference only advances on changed frames, so slow drift still triggers.
+        """
+        thumb = cv2.resize(frame, (32, 32), interpolation=cv2.INTER_AREA)
+        if self._thumb_ref is not None and cv2.absdiff(thumb, self._thumb_ref).max() < self.static_threshold:
+            return False
+        
+        self._thumb_ref = thumb
+        return True
+    
     def update_tracking(self, cups: List[Tuple[int, int, int, int]]):
         """Update tracking history for each cup."""
         if len(cups) == 3:
-            for i, (x, y, w, h) in enumerate(cups):
-                center_x = x + w // 2
-                center_y = y + h // 2
-                self.position_history[i].append((center_x, center_y))
+            _push_centers(self._traj, self._traj_written % self.history_length,
+                          np.asarray(cups, dtype=np.int32))
+            self._traj_written += 1
+    
+    def trajectory(self, cup_index: int) -> np.ndarray:
+        """Return the recorded centers of a cup, oldest first, as an (N, 2) int32 array."""
+        n = self.history_length
+        if self._traj_written <= n:
+            return self._traj[cup_index, :self._traj_written]
+        head = self._traj_written % n
+        return np.concatenate((self._traj[cup_index, head:], self._traj[cup_index, :head]))
+    
+    @property
+    def position_history(self) -> Dict[int, List[Tuple[int, int]]]:
+        """Per-cup list of recorded (x, y) centers, oldest first."""
+        return {i: [tuple(p) for p in self.trajectory(i).tolist()] for i in range(3)}
+    
+    def reset_history(self):
+        """Forget all recorded cup centers."""
+        self._traj_written = 0
     
     def predict_ball_position(self) -> Optional[int]:
         """Predict ball position based on tracking."""
@@ -163,9 +338,10 @@ class AdvancedCupTracker:
         # to determine if cups were swapped
         return self.ball_cup_index
     
-    def draw_annotations(self, frame: np.ndarray, cups: List[Tuple[int, int, int, int]]) -> np.ndarray:
-        """Draw all annotations on the frame."""
-        annotated = frame.copy()
+    def draw_annotations(self, frame: np.ndarray, cups: List[Tuple[int, int, int, int]],
+                         inplace: bool = False) -> np.ndarray:
+        """Draw all annotations on a copy of the frame, or on ``frame`` itself when ``inplace``."""
+        annotated = frame if inplace else frame.copy()
         
         for i, (x, y, w, h) in enumerate(cups):
             # Choose color
@@ -183,16 +359,15 @@ class AdvancedCupTracker:
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
             
             # Draw trajectory
-            if len(self.position_history[i]) > 1:
-                points = list(self.position_history[i])
-                for j in range(1, len(points)):
-                    cv2.line(annotated, points[j-1], points[j], color, 2)
+            points = self.trajectory(i)
+            if len(points) > 1:
+                cv2.polylines(annotated, [points.reshape(-1, 1, 2)], False, color, 2)
         
         # Show ball prediction
         predicted = self.predict_ball_position()
         if predicted is not None:
-            cv2.putText(annotated, f"Ball -> Cup #{predicted+1}", (10, 35),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
+            # Only three possible strings: blitted from cached sprites
+            blit_text(annotated, f"Ball -> Cup #{predicted+1}", (10, 35), 1.2, (0, 255, 255), 3)
             
             # Draw indicator at predicted cup
             if len(cups) > predicted:
@@ -205,13 +380,35 @@ class AdvancedCupTracker:
             cv2.putText(annotated, "BALL", (x+w//2-20, y+h+30),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
         
-        # Instructions
-        cv2.putText(annotated, "Controls: 1/2/3=Mark Ball | R=Reset | Q=Quit",
-                   (10, frame.shape[0]-10),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        # Instructions (pre-rendered, blitted through a mask)
+        self._draw_hud(annotated)
         
         return annotated
     
+    def _draw_hud(self, annotated: np.ndarray):
+        """Stamp the constant instructions line, rasterized once per frame size."""
+        h, w = annotated.shape[:2]
+        strip = min(h, 30)  # Bottom rows covered by the text
+        if self._hud is None or self._hud.shape[:2] != (strip, w):
+            self._hud = np.zeros((strip, w, 3), dtype=np.uint8)
+            cv2.putText(self._hud, "Controls: 1/2/3=Mark Ball | R=Reset | Q=Quit",
+                       (10, strip - 10),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            # White text: any channel holds the glyph coverage
+            self._hud_alpha = self._hud[:, :, :1].copy()
+        
+        blend(annotated[h - strip:], self._hud, self._hud_alpha)
+    
+    def _show(self, window: str, annotated: np.ndarray):
+        """Display ``annotated``, halved with nearest-neighbour first when taller than DISPLAY_MAX_HEIGHT."""
+        h, w = annotated.shape[:2]
+        if h > self.DISPLAY_MAX_HEIGHT:
+            # A quarter of the pixels to hand over to the GUI backend every frame
+            annotated = cv2.resize(annotated, (w // 2, h // 2),
+                                   dst=self._scratch("_display", (h // 2, w // 2, 3)),
+                                   interpolation=cv2.INTER_NEAREST)
+        cv2.imshow(window, annotated)
+    
     def run(self):
         """Main tracking loop."""
         print("Advanced Cup Tracker Started")
@@ -221,24 +418,40 @@ class AdvancedCupTracker:
         print("  Q: Quit")
         
         try:
+            # Compile the trajectory kernel now rather than on the first tracked frame
+            _push_centers(np.zeros((3, 1, 2), dtype=np.int32), 0, np.zeros((3, 4), dtype=np.int32))
+            
+            # Capture runs on its own thread; the loop always takes the newest frame
+            self.start_capture_thread()
+            
             while True:
-                frame = self.capture_frame()
+                frame = self.read_latest_frame()
                 self.frame_count += 1
                 
                 # Detect or track cups
-                if self.frame_count % 10 == 1:  # Re-detect every 10 frames
-                    cups = self.detect_cups_color(frame)
+                if len(self.cup_positions) == 3 and not self._scene_changed(frame):
+                    cups = self.cup_positions  # Nothing moved: skip detection and tracking
                 else:
                     cups = self.track_with_optical_flow(frame)
+                    
+                    # Re-detect while cups move fast enough for LK to drift, while a
+                    # cup is missing, and every redetect_interval frames regardless
+                    # (unless tracking already fell back to detection on this frame)
+                    if self._last_detect_frame != self.frame_count and (
+                            self.last_motion > self.redetect_motion or len(cups) != 3
+                            or self.frame_count - self._last_detect_frame >= self.redetect_interval):
+                        cups = self.detect_cups_color(frame)
                 
                 self.cup_positions = cups
+                self._roi = (roi_around(cups, frame.shape, self.roi_margin, self.DETECT_SCALE)
+                             if len(cups) == 3 else None)
                 self.update_tracking(cups)
                 
-                # Annotate
-                annotated = self.draw_annotations(frame, cups)
+                # Annotate (the raw capture is not needed afterwards)
+                annotated = self.draw_annotations(frame, cups, inplace=True)
                 
                 # Display
-                cv2.imshow("Advanced Cup Tracker", annotated)
+                self._show("Advanced Cup Tracker", annotated)
                 
                 # Input handling
                 key = cv2.waitKey(1) & 0xFF
@@ -256,15 +469,14 @@ class AdvancedCupTracker:
                     print("Ball marked under Cup 3")
                 elif key == ord('r'):
                     self.ball_cup_index = None
-                    self.position_history = {0: deque(maxlen=50), 1: deque(maxlen=50), 2: deque(maxlen=50)}
+                    self.reset_history()
+                    self._roi = None  # Next detection scans the whole frame
                     print("Reset")
                 
-                # Store previous frame
-                self.prev_frame = frame.copy()
-                
         except KeyboardInterrupt:
             print("\nStopped")
         finally:
+            self.stop_capture_thread()
             cv2.destroyAllWindows()
 
 
@@ -9,29 +9,71 @@ import cv2
 import numpy as np
 import mss
 import time
+import os
 from collections import deque
 from typing import List, Tuple, Optional, Dict
+from screen_capture import (FrameGrabber, bgra_to_bgr, blend, blit_text,
+                            make_capture_backend, roi_around)
 
 
 class CupTracker:
     """Main class for tracking cups and predicting ball position in the 3 cup game."""
     
-    def __init__(self, screen_region: Optional[Dict] = None):
+    DETECT_SCALE = 2  # Detection runs on a pyrDown'd frame
+    DISPLAY_MAX_HEIGHT = 720  # Taller frames are shown at half size
+    LIVE_FPS = 60  # Frame rate run() tries to keep up with when max_fps is not set
+    CUP_LABELS = ("Cup 1", "Cup 2", "Cup 3")  # Built once instead of formatted per frame
+    
+    def __init__(self, screen_region: Optional[Dict] = None, max_fps: Optional[float] = None):
         """
         Initialize the cup tracker.
         
         Args:
             screen_region: Dictionary with 'top', 'left', 'width', 'height' for screen capture.
                           If None, user will select region.
+            max_fps: Optional cap on loop rate; the loop only sleeps for the part of the
+                     frame budget left after processing. None runs as fast as work allows.
         """
         self.screen_region = screen_region
+        self.max_fps = max_fps
         self.sct = None  # Lazy initialization
+        self._hud = None  # Pre-rendered instructions strip
+        self._hud_alpha = None
+        
+        # Per-frame scratch buffers, allocated on first use and reused afterwards
+        self._small = None
+        self._gray = None
+        self._blurred = None
+        self._edges = None
+        self._blobs = None
+        self._display = None
         self.cups = []  # List of detected cup positions
         self.ball_position = None  # Current/predicted ball position
         self.last_known_ball_position = None  # Last confirmed ball position
         self.cup_trajectories = {0: deque(maxlen=30), 1: deque(maxlen=30), 2: deque(maxlen=30)}
+        # frame_count of each trajectory point, kept alongside so points stay (x, y)
+        self._trajectory_frames = {0: deque(maxlen=30), 1: deque(maxlen=30), 2: deque(maxlen=30)}
         self.tracking_history = []
         self.frame_count = 0
+        self.background = None  # Empty-scene reference at detection scale (see set_background)
+        self.roi_margin = 30  # Search margin (pixels) around the known cups
+        
+        # Adaptive detection: when detecting takes longer than a frame at target_fps,
+        # detect every few frames and extrapolate the cups in between. Set by run();
+        # None (frame-by-frame use of annotate_frame) detects on every frame
+        self.target_fps = None
+        self.max_detect_interval = 4
+        self._detect_every = 1
+        self._frames_since_detect = 0
+        self._detected_cups = []  # Cups as of the last real detection
+        
+        self._grabber = None  # Background capture thread (see start_capture_thread)
+        self._backend = None  # Capture backend of capture_frame, created on first use
+        self._bgr = None  # Reused BGR buffer of capture_frame
+        
+        # Small ROIs gain nothing from a large OpenCV pool; cap it to avoid oversubscription
+        cv2.setNumThreads(max(1, min(4, (os.cpu_count() or 1) // 2)))
+        cv2.setUseOptimized(True)
         
     def select_screen_region(self) -> Dict:
         """
@@ -66,24 +108,60 @@ class CupTracker:
         return None
     
     def capture_frame(self) -> np.ndarray:
-        """Capture a frame from the selected screen region."""
+        """Capture a frame from the selected screen region (buffer is reused between calls)."""
         if self.screen_region is None:
             self.screen_region = self.select_screen_region()
             if self.screen_region is None:
                 raise ValueError("No screen region selected")
         
-        # Initialize mss if not already done
-        if self.sct is None:
-            self.sct = mss.mss()
+        if self._backend is None:
+            self._backend = make_capture_backend(self.screen_region, self.max_fps or self.LIVE_FPS)
+        self._bgr = bgra_to_bgr(self._backend.grab(), self._bgr)
+        return self._bgr
+    
+    def start_capture_thread(self):
+        """Grab frames on a background thread so capture overlaps detection."""
+        if self._grabber is not None:
+            return
+        
+        if self.screen_region is None:
+            self.screen_region = self.select_screen_region()
+            if self.screen_region is None:
+                raise ValueError("No screen region selected")
+        
+        self._grabber = FrameGrabber(self.screen_region, self.max_fps or self.LIVE_FPS)
+        self._grabber.start()
+    
+    def stop_capture_thread(self):
+        """Stop the background capture thread, if running."""
+        if self._grabber is None:
+            return
         
-        screenshot = self.sct.grab(self.screen_region)
-        frame = np.array(screenshot)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-        return frame
+        self._grabber.stop()
+        self._grabber = None
+    
+    def read_latest_frame(self, timeout: float = 1.0) -> np.ndarray:
+        """Return the newest frame from the capture thread (buffer is reused between calls)."""
+        if self._grabber is None:
+            raise RuntimeError("Capture thread is not running")
+        return self._grabber.read(timeout)
+    
+    def _scratch(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """Return a ``shape`` view of the reusable uint8 buffer ``self.<name>``, growing it when needed."""
+        buf = getattr(self, name)
+        if buf is None or buf.ndim != len(shape) or any(b < s for b, s in zip(buf.shape, shape)):
+            # Grow only, so ROIs of varying size keep sharing one allocation
+            grown = shape if buf is None or buf.ndim != len(shape) else np.maximum(buf.shape, shape)
+            buf = np.empty(tuple(int(s) for s in grown), dtype=np.uint8)
+            setattr(self, name, buf)
+        return buf[tuple(slice(0, s) for s in shape)]
     
     def detect_cups(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
-        Detect cups in the frame using contour detection.
+        Detect cups in the frame using edge blobs and connected components.
+        
+        Once 3 cups are known, only the area around them is searched; the whole
+        frame is scanned again when that does not yield 3 cups.
         
         Args:
             frame: Input frame
@@ -91,40 +169,132 @@ class CupTracker:
         Returns:
             List of tuples (x, y, w, h) representing cup bounding boxes
         """
+        if len(self.cups) == 3:
+            x0, y0, x1, y1 = roi_around(self.cups, frame.shape, self.roi_margin, self.DETECT_SCALE)
+            cups = self._detect_cups_in(frame[y0:y1, x0:x1], x0, y0)
+            if len(cups) == 3:
+                return cups
+        
+        return self._detect_cups_in(frame, 0, 0)
+    
+    def _detect_cups_in(self, frame: np.ndarray, x0: int, y0: int) -> List[Tuple[int, int, int, int]]:
+        """Detect cups in ``frame``, a crop whose top-left corner sits at (x0, y0)."""
+        # Detect at reduced resolution: cups stay well above the size limits and
+        # every following pass touches 4x fewer pixels
+        h, w = frame.shape[:2]
+        small = cv2.pyrDown(frame, dst=self._scratch("_small", ((h + 1) // 2, (w + 1) // 2, 3)))
+        scale = self.DETECT_SCALE
+        plane = small.shape[:2]
+        
         # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._scratch("_gray", plane))
         
         # Apply Gaussian blur
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0, dst=self._scratch("_blurred", plane))
         
-        # Edge detection
-        edges = cv2.Canny(blurred, 50, 150)
+        background = None
+        if self.background is not None:
+            bx, by = x0 // scale, y0 // scale
+            background = self.background[by:by + plane[0], bx:bx + plane[1]]
         
-        # Find contours
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if background is not None and background.shape == plane:
+            # Background subtraction: cups are whatever differs from the empty scene
+            diff = cv2.absdiff(blurred, background, dst=self._scratch("_edges", plane))
+            _, blobs = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY, dst=self._scratch("_blobs", plane))
+        else:
+            # Edge detection
+            edges = cv2.Canny(blurred, 50, 150, edges=self._scratch("_edges", plane))
+            
+            # Close the edges into solid blobs
+            blobs = cv2.dilate(edges, np.ones((3, 3), np.uint8), dst=self._scratch("_blobs", plane))
         
-        # Filter contours by area and aspect ratio to find cup-like shapes
-        cups = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 500:  # Minimum area threshold
-                x, y, w, h = cv2.boundingRect(contour)
-                aspect_ratio = float(w) / h if h > 0 else 0
-                
-                # Cups typically have certain aspect ratios
-                if 0.5 < aspect_ratio < 2.5 and w > 20 and h > 20:
-                    cups.append((x, y, w, h))
+        # Label the blobs in a single native pass
+        _, _, stats, _ = cv2.connectedComponentsWithStats(blobs, connectivity=8, ltype=cv2.CV_32S)
+        stats = stats[1:]  # Row 0 is the background
         
-        # Sort cups by x-coordinate (left to right)
-        cups = sorted(cups, key=lambda c: c[0])
+        # Filter blobs by area and aspect ratio to find cup-like shapes
+        w = stats[:, cv2.CC_STAT_WIDTH]
+        h = stats[:, cv2.CC_STAT_HEIGHT]
+        areas = stats[:, cv2.CC_STAT_AREA]
+        aspect_ratio = w / np.maximum(h, 1)
+        keep = np.flatnonzero((areas > 500 / scale ** 2) &  # Minimum area threshold
+                              (aspect_ratio > 0.5) & (aspect_ratio < 2.5) & (w > 20 / scale) & (h > 20 / scale))
         
         # Keep only the 3 most prominent cups if more are detected
-        if len(cups) > 3:
-            cups = sorted(cups, key=lambda c: c[2] * c[3], reverse=True)[:3]
-            cups = sorted(cups, key=lambda c: c[0])
+        if keep.size > 3:
+            keep = keep[np.argpartition(-areas[keep], 3)[:3]]
+        
+        # Sort cups by x-coordinate (left to right)
+        keep = keep[np.argsort(stats[keep, cv2.CC_STAT_LEFT], kind="stable")]
+        
+        boxes = stats[keep, :4] * scale  # LEFT, TOP, WIDTH, HEIGHT in crop coordinates
+        boxes[:, 0] += x0
+        boxes[:, 1] += y0
+        cups = [tuple(box) for box in boxes.tolist()]
         
         return cups
     
+    def set_background(self, frame: Optional[np.ndarray]):
+        """
+        Use a frame of the empty scene as background reference.
+        
+        Once set, detect_cups finds cups by background subtraction instead of
+        running Canny on every frame. Pass None to go back to edge detection.
+        
+        Args:
+            frame: Frame showing the play area without cups, or None
+        """
+        if frame is None:
+            self.background = None
+            return
+        
+        gray = cv2.cvtColor(cv2.pyrDown(frame), cv2.COLOR_BGR2GRAY)
+        self.background = cv2.GaussianBlur(gray, (5, 5), 0)
+    
+    def _update_cups(self, frame: np.ndarray) -> Tuple[List[Tuple[int, int, int, int]], bool]:
+        """
+        Detect the cups, or extrapolate them on frames where detection is skipped.
+        
+        The detection interval adapts to the measured detection time so the loop
+        keeps up with ``target_fps``; it never exceeds ``max_detect_interval``.
+        
+        Args:
+            frame: Input frame
+            
+        Returns:
+            (cups, detected): cup boxes and whether they come from a real detection
+        """
+        if self.target_fps and len(self._detected_cups) == 3 and len(self.cups) == 3 \
+                and self._frames_since_detect + 1 < self._detect_every:
+            self._frames_since_detect += 1
+            return self._extrapolate_cups(), False
+        
+        start = time.perf_counter()
+        cups = self.detect_cups(frame)
+        elapsed = time.perf_counter() - start
+        
+        if self.target_fps:
+            self._detect_every = max(1, min(self.max_detect_interval,
+                                            int(elapsed * self.target_fps)))
+        self._frames_since_detect = 0
+        self._detected_cups = cups
+        return cups, True
+    
+    def _extrapolate_cups(self) -> List[Tuple[int, int, int, int]]:
+        """Shift the last detected boxes along the velocity of their last two recorded centers."""
+        cups = []
+        for i, (x, y, w, h) in enumerate(self._detected_cups):
+            trajectory, frames = self.cup_trajectories[i], self._trajectory_frames[i]
+            if len(trajectory) >= 2:
+                (x1, y1), (x2, y2) = trajectory[-2], trajectory[-1]
+                f1, f2 = frames[-2], frames[-1]
+                if f2 > f1:
+                    steps = (self.frame_count - f2) / (f2 - f1)
+                    x += int(round((x2 - x1) * steps))
+                    y += int(round((y2 - y1) * steps))
+            cups.append((x, y, w, h))
+        return cups
+    
     def track_cup_movements(self, current_cups: List[Tuple[int, int, int, int]]):
         """
         Track the movement of cups between frames.
@@ -136,7 +306,8 @@ class CupTracker:
             for i, cup in enumerate(current_cups):
                 center_x = cup[0] + cup[2] // 2
                 center_y = cup[1] + cup[3] // 2
-                self.cup_trajectories[i].append((center_x, center_y, self.frame_count))
+                self.cup_trajectories[i].append((center_x, center_y))
+                self._trajectory_frames[i].append(self.frame_count)
     
     def predict_ball_position(self) -> Optional[int]:
         """
@@ -161,49 +332,47 @@ class CupTracker:
         
         return None
     
-    def annotate_frame(self, frame: np.ndarray) -> np.ndarray:
+    def annotate_frame(self, frame: np.ndarray, inplace: bool = False) -> np.ndarray:
         """
         Annotate the frame with cup numbers, ball position, and predictions.
         
         Args:
             frame: Input frame
+            inplace: Draw directly into ``frame`` instead of a copy (for loops that
+                     no longer need the raw frame, such as run())
             
         Returns:
             Annotated frame
         """
-        annotated = frame.copy()
+        annotated = frame if inplace else frame.copy()
         
-        # Detect and draw cups
-        cups = self.detect_cups(frame)
+        # Detect (or extrapolate, see _update_cups) and draw cups
+        cups, detected = self._update_cups(frame)
         self.cups = cups
         
+        # Prediction doesn't change while drawing, so look it up once
+        predicted_pos = self.predict_ball_position()
+        
         for i, (x, y, w, h) in enumerate(cups):
-            # Draw bounding box
-            color = (0, 255, 0)  # Green by default
-            
-            # Highlight predicted ball position
-            predicted_pos = self.predict_ball_position()
-            if predicted_pos == i:
-                color = (0, 0, 255)  # Red for predicted ball position
+            # Draw bounding box, red for the predicted ball position, green otherwise
+            color = (0, 0, 255) if predicted_pos == i else (0, 255, 0)
             
             cv2.rectangle(annotated, (x, y), (x + w, y + h), color, 2)
             
             # Add cup number
-            label = f"Cup {i + 1}"
-            cv2.putText(annotated, label, (x, y - 10), 
+            cv2.putText(annotated, self.CUP_LABELS[i], (x, y - 10), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-            
-            # Draw trajectory
-            if len(self.cup_trajectories[i]) > 1:
-                points = list(self.cup_trajectories[i])
-                for j in range(1, len(points)):
-                    cv2.line(annotated, 
-                            (points[j-1][0], points[j-1][1]),
-                            (points[j][0], points[j][1]),
-                            (255, 255, 0), 1)
-        
-        # Track cup movements
-        self.track_cup_movements(cups)
+        
+        # Draw all trajectories (same color) with a single polylines call
+        # polylines needs contiguous (N, 1, 2) int32 points
+        trajectories = [np.asarray(self.cup_trajectories[i], dtype=np.int32).reshape(-1, 1, 2)
+                        for i in range(len(cups)) if len(self.cup_trajectories[i]) > 1]
+        if trajectories:
+            cv2.polylines(annotated, trajectories, False, (255, 255, 0), 1)
+        
+        # Track cup movements (measured positions only)
+        if detected:
+            self.track_cup_movements(cups)
         
         # Annotate last known ball position
         if self.last_known_ball_position is not None and len(cups) > self.last_known_ball_position:
@@ -213,39 +382,65 @@ class CupTracker:
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
         
         # Display prediction
-        predicted_pos = self.predict_ball_position()
         if predicted_pos is not None:
-            text = f"Predicted: Cup {predicted_pos + 1}"
-            cv2.putText(annotated, text, (10, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            # Only three possible strings: blitted from cached sprites
+            blit_text(annotated, f"Predicted: Cup {predicted_pos + 1}", (10, 30),
+                       1, (0, 0, 255), 2)
         
-        # Display instructions
-        cv2.putText(annotated, "Press 1/2/3: Mark ball position | R: Reset | Q: Quit", 
-                   (10, frame.shape[0] - 10),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        # Instructions (pre-rendered, blitted through a mask)
+        self._draw_hud(annotated)
         
         return annotated
     
+    def _draw_hud(self, annotated: np.ndarray):
+        """Stamp the constant instructions line, rasterized once per frame size."""
+        h, w = annotated.shape[:2]
+        strip = min(h, 30)  # Bottom rows covered by the text
+        if self._hud is None or self._hud.shape[:2] != (strip, w):
+            self._hud = np.zeros((strip, w, 3), dtype=np.uint8)
+            cv2.putText(self._hud, "Press 1/2/3: Mark ball position | R: Reset | Q: Quit",
+                       (10, strip - 10),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            # White text: any channel holds the glyph coverage
+            self._hud_alpha = self._hud[:, :, :1].copy()
+        
+        blend(annotated[h - strip:], self._hud, self._hud_alpha)
+    
+    def _show(self, window: str, annotated: np.ndarray):
+        """Display ``annotated``, halved with nearest-neighbour first when taller than DISPLAY_MAX_HEIGHT."""
+        h, w = annotated.shape[:2]
+        if h > self.DISPLAY_MAX_HEIGHT:
+            # A quarter of the pixels to hand over to the GUI backend every frame
+            annotated = cv2.resize(annotated, (w // 2, h // 2),
+                                   dst=self._scratch("_display", (h // 2, w // 2, 3)),
+                                   interpolation=cv2.INTER_NEAREST)
+        cv2.imshow(window, annotated)
+    
     def run(self):
         """Main loop to run the cup tracking system."""
         print("Cup Tracking System Started")
         print("Controls:")
         print("  1, 2, 3: Mark the ball position under cup 1, 2, or 3")
         print("  R: Reset tracking")
+        print("  B: Capture the empty scene as background (faster detection)")
         print("  Q: Quit")
         print()
         
         try:
+            # Capture runs on its own thread; the loop always takes the newest frame
+            self.start_capture_thread()
+            self.target_fps = self.max_fps or self.LIVE_FPS
+            
             while True:
-                # Capture frame
-                frame = self.capture_frame()
+                loop_start = time.monotonic()
+                frame = self.read_latest_frame()
                 self.frame_count += 1
                 
-                # Annotate frame
-                annotated = self.annotate_frame(frame)
+                # Annotate frame (the raw capture is not needed afterwards)
+                annotated = self.annotate_frame(frame, inplace=True)
                 
                 # Display
-                cv2.imshow("Cup Tracker", annotated)
+                self._show("Cup Tracker", annotated)
                 
                 # Handle keyboard input
                 key = cv2.waitKey(1) & 0xFF
@@ -265,14 +460,24 @@ class CupTracker:
                 elif key == ord('r'):
                     self.last_known_ball_position = None
                     self.cup_trajectories = {0: deque(maxlen=30), 1: deque(maxlen=30), 2: deque(maxlen=30)}
+                    self._trajectory_frames = {0: deque(maxlen=30), 1: deque(maxlen=30), 2: deque(maxlen=30)}
+                    self.cups = []  # Next detection scans the whole frame
+                    self._detected_cups = []
                     print("Tracking reset")
+                elif key == ord('b'):
+                    self.set_background(self.read_latest_frame())  # Unannotated frame
+                    print("Background captured")
                 
-                # Small delay to reduce CPU usage
-                time.sleep(0.01)
+                # Optional rate cap: sleep only for what is left of the frame budget
+                if self.max_fps:
+                    remaining = 1.0 / self.max_fps - (time.monotonic() - loop_start)
+                    if remaining > 0:
+                        time.sleep(remaining)
                 
         except KeyboardInterrupt:
             print("\nInterrupted by user")
         finally:
+            self.stop_capture_thread()
             cv2.destroyAllWindows()
 
 
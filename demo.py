@@ -8,6 +8,42 @@ import cv2
 import numpy as np
 from cup_tracker import CupTracker
 import time
+from functools import lru_cache
+
+
+CUP_FILL = (100, 100, 200)
+CUP_OUTLINE = (50, 50, 150)
+SPRITE_PAD = 2  # Room for the 3 px outline around the trapezoid
+
+
+def _cup_points(x, y):
+    """Trapezoid (cup) outline with its base centered on (x, y)."""
+    pts = np.array([
+        [x - 40, y],
+        [x + 40, y],
+        [x + 30, y - 80],
+        [x - 30, y - 80]
+    ], np.int32)
+    return pts.reshape((-1, 1, 2))
+
+
+@lru_cache(maxsize=None)
+def _background(width, height):
+    """Light background, filled once per frame size (treat as read-only)."""
+    return np.full((height, width, 3), 240, dtype=np.uint8)
+
+
+@lru_cache(maxsize=None)
+def _cup_sprite():
+    """Cup rasterized once, as a (sprite, mask) pair anchored like _cup_points."""
+    size = (80 + 1 + 2 * SPRITE_PAD, 80 + 1 + 2 * SPRITE_PAD)
+    pts = _cup_points(40 + SPRITE_PAD, 80 + SPRITE_PAD)
+    sprite = np.zeros(size + (3,), dtype=np.uint8)
+    mask = np.zeros(size + (1,), dtype=np.uint8)
+    for canvas, fill, outline in ((sprite, CUP_FILL, CUP_OUTLINE), (mask, 255, 255)):
+        cv2.fillPoly(canvas, [pts], fill)
+        cv2.polylines(canvas, [pts], True, outline, 3)
+    return sprite, mask.astype(bool)
 
 
 def create_synthetic_cup_frame(width=800, height=600, cup_positions=None):
@@ -22,23 +58,22 @@ def create_synthetic_cup_frame(width=800, height=600, cup_positions=None):
     Returns:
         Synthetic frame with cups
     """
-    frame = np.ones((height, width, 3), dtype=np.uint8) * 240  # Light background
+    frame = _background(width, height).copy()  # Light background
     
     if cup_positions is None:
         cup_positions = [(150, 300), (400, 300), (650, 300)]
     
-    # Draw cup-like shapes
+    # Stamp the pre-rendered cup; rasterize only where it would be clipped
+    sprite, mask = _cup_sprite()
     for x, y in cup_positions:
-        # Draw trapezoid shape (cup)
-        pts = np.array([
-            [x - 40, y],
-            [x + 40, y],
-            [x + 30, y - 80],
-            [x - 30, y - 80]
-        ], np.int32)
-        pts = pts.reshape((-1, 1, 2))
-        cv2.fillPoly(frame, [pts], (100, 100, 200))
-        cv2.polylines(frame, [pts], True, (50, 50, 150), 3)
+        top, left = y - 80 - SPRITE_PAD, x - 40 - SPRITE_PAD
+        if top >= 0 and left >= 0 and top + sprite.shape[0] <= height and left + sprite.shape[1] <= width:
+            region = frame[top:top + sprite.shape[0], left:left + sprite.shape[1]]
+            np.copyto(region, sprite, where=mask)
+        else:
+            pts = _cup_points(x, y)
+            cv2.fillPoly(frame, [pts], CUP_FILL)
+            cv2.polylines(frame, [pts], True, CUP_OUTLINE, 3)
     
     return frame
 
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Optional Numba support
+Exposes njit/prange from Numba when it is installed, and plain-Python
+stand-ins otherwise, so JIT-compiled helpers keep working without it.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
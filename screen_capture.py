@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Screen Capture
+Capture backends, the background capture thread and the frame helpers shared
+by the screen recorder and the cup trackers.
+"""
+
+import cv2
+import numpy as np
+import mss
+import sys
+import threading
+import time
+from functools import lru_cache
+from typing import Optional, Dict, Tuple
+
+# On Windows, skip compositing layered (overlay/transparent) windows into the
+# grab: BitBlt without CAPTUREBLT is much cheaper, and such windows are rarely
+# wanted in a recording. (A future camera input should likewise open its
+# cv2.VideoCapture with CAP_PROP_BUFFERSIZE=1 so it never serves stale frames.)
+if sys.platform == "win32":
+    try:
+        import mss.windows.gdi as _mss_gdi  # mss >= 10 reads the flag here
+    except ImportError:
+        import mss.windows as _mss_gdi
+    if hasattr(_mss_gdi, "CAPTUREBLT"):
+        _mss_gdi.CAPTUREBLT = 0
+
+
+class MssBackend:
+    """Screen grabs through mss (GDI on Windows, XShm on Linux, CoreGraphics on macOS)."""
+    
+    def __init__(self, region: Dict):
+        self.region = region
+        # mss handles are not thread-safe: each grabbing thread gets its own
+        self._tls = threading.local()
+        self._instances = []
+        self._lock = threading.Lock()
+    
+    def _sct(self):
+        """Return the calling thread's mss instance, creating it on first use."""
+        sct = getattr(self._tls, "sct", None)
+        if sct is None:
+            sct = self._tls.sct = mss.mss()
+            with self._lock:
+                self._instances.append(sct)
+        return sct
+    
+    def grab(self) -> np.ndarray:
+        """Return the region as an (H, W, 4) BGRA array wrapping the grab without a copy."""
+        screenshot = self._sct().grab(self.region)
+        return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+            screenshot.height, screenshot.width, 4)
+    
+    def close(self):
+        with self._lock:
+            for sct in self._instances:
+                sct.close()
+            self._instances.clear()
+        self._tls = threading.local()
+
+
+class DXcamBackend:
+    """Screen grabs through DXGI Desktop Duplication with DXcam (Windows only)."""
+    
+    def __init__(self, region: Dict, fps: float):
+        import dxcam  # Optional dependency
+        
+        left, top = region["left"], region["top"]
+        self._camera = dxcam.create(
+            output_color="BGRA",
+            region=(left, top, left + region["width"], top + region["height"]))
+        if self._camera is None:
+            raise RuntimeError("DXcam could not open the display")
+        self._camera.start(target_fps=max(1, int(fps)))  # DXcam takes whole rates only
+    
+    def grab(self) -> np.ndarray:
+        """Return the newest (H, W, 4) BGRA frame, waiting for one if needed."""
+        frame = self._camera.get_latest_frame()
+        if frame is None:
+            raise RuntimeError("DXcam returned no frame")
+        return frame
+    
+    def close(self):
+        self._camera.stop()
+
+
+def make_capture_backend(region: Dict, fps: float, name: str = "auto"):
+    """
+    Pick a capture backend: DXcam on Windows when installed, mss everywhere else.
+    Backends expose ``grab()`` returning an (H, W, 4) BGRA array, and ``close()``.
+    """
+    if name == "dxcam" or (name == "auto" and sys.platform == "win32"):
+        try:
+            return DXcamBackend(region, fps)
+        except Exception as e:
+            print(f"DXcam unavailable ({e}), using mss")
+    return MssBackend(region)
+
+
+def bgra_to_bgr(bgra: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Drop the alpha channel of an (H, W, 4) BGRA array, writing into ``out`` when it fits."""
+    if out is None or out.shape[:2] != bgra.shape[:2]:
+        out = np.empty((bgra.shape[0], bgra.shape[1], 3), dtype=np.uint8)
+    cv2.mixChannels([bgra], [out], [0, 0, 1, 1, 2, 2])
+    return out
+
+
+class FrameGrabber:
+    """Grab a screen region on a background thread so capture overlaps processing."""
+    
+    def __init__(self, region: Dict, fps: float):
+        """
+        Args:
+            region: Dictionary with 'top', 'left', 'width', 'height' to capture
+            fps: Target capture rate (may be below 1); grabs are paced to it so the
+                 thread does not spin a core grabbing frames the consumer will drop
+        """
+        self.region = region
+        self.fps = fps
+        self._thread = None
+        self._stop = threading.Event()
+        self._frame_ready = threading.Condition()
+        self._latest_frame = None
+        self._front_frame = None
+        self._frame_is_new = False
+    
+    def start(self):
+        """Start the capture thread, if not running."""
+        if self._thread is not None:
+            return
+        
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the capture thread, if running."""
+        if self._thread is None:
+            return
+        
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+    
+    def _capture_loop(self):
+        """Producer loop: keep publishing the newest frame, dropping stale ones."""
+        # DXGI Desktop Duplication on Windows (with DXcam), mss elsewhere; the backend
+        # is created here so its handles belong to the producer thread
+        backend = make_capture_backend(self.region, self.fps)
+        
+        # Pace grabs against a monotonic deadline like the recorder's loops; waiting
+        # on the stop event lets stop() interrupt the sleep
+        frame_period = 1.0 / self.fps
+        deadline = time.monotonic()
+        try:
+            back = None
+            while not self._stop.is_set():
+                back = bgra_to_bgr(backend.grab(), back)
+                with self._frame_ready:
+                    # Triple buffering: never write into the frame the consumer is reading
+                    self._latest_frame, back = back, self._latest_frame
+                    self._frame_is_new = True
+                    self._frame_ready.notify()
+                
+                deadline += frame_period
+                now = time.monotonic()
+                if now - deadline > 2 * frame_period:
+                    deadline = now  # Fell too far behind: drop the backlog instead of bursting
+                elif deadline > now:
+                    self._stop.wait(deadline - now)
+        finally:
+            backend.close()
+    
+    def read(self, timeout: float = 1.0) -> np.ndarray:
+        """Return the newest frame from the capture thread (buffer is reused between calls)."""
+        with self._frame_ready:
+            if not self._frame_ready.wait_for(lambda: self._frame_is_new, timeout):
+                raise RuntimeError("Capture thread stopped producing frames")
+            self._front_frame, self._latest_frame = self._latest_frame, self._front_frame
+            self._frame_is_new = False
+        return self._front_frame
+
+
+def blend(dst: np.ndarray, layer: np.ndarray, alpha: np.ndarray):
+    """
+    Composite ``layer`` (drawn over black) onto ``dst`` in place, weighted by its
+    (H, W, 1) uint8 coverage ``alpha``, so antialiased text edges stay smooth.
+    """
+    blended = (dst * (255 - alpha).astype(np.uint16) + 127) // 255 + layer
+    np.copyto(dst, np.minimum(blended, 255), casting="unsafe")
+
+
+@lru_cache(maxsize=None)
+def text_sprite(text: str, font_scale: float, color: Tuple[int, int, int], thickness: int):
+    """
+    Rasterize ``text`` once into a small BGR sprite (treat as read-only).
+    
+    Returns:
+        (sprite, alpha, top, left): the sprite drawn over black, its (H, W, 1) glyph
+        coverage and the position of the text origin inside the sprite
+    """
+    (tw, th), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+    # Pad by the stroke thickness so no glyph edge is clipped
+    top, left = th + thickness, thickness
+    size = (top + baseline + thickness, left + tw + thickness)
+    alpha = np.zeros(size + (1,), dtype=np.uint8)
+    cv2.putText(alpha, text, (left, top), cv2.FONT_HERSHEY_SIMPLEX, font_scale, 255, thickness)
+    sprite = np.zeros(size + (3,), dtype=np.uint8)
+    cv2.putText(sprite, text, (left, top), cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness)
+    return sprite, alpha, top, left
+
+
+def blit_text(frame: np.ndarray, text: str, org: Tuple[int, int], font_scale: float,
+              color: Tuple[int, int, int], thickness: int):
+    """Draw ``text`` at ``org`` like cv2.putText, blending a cached sprite instead of rasterizing."""
+    sprite, alpha, top, left = text_sprite(text, font_scale, color, thickness)
+    x, y = org[0] - left, org[1] - top
+    # Clip the sprite to the frame
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + sprite.shape[1], frame.shape[1]), min(y + sprite.shape[0], frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+    blend(frame[y0:y1, x0:x1], sprite[y0 - y:y1 - y, x0 - x:x1 - x],
+          alpha[y0 - y:y1 - y, x0 - x:x1 - x])
+
+
+def roi_around(boxes, shape: Tuple[int, ...], margin: int, align: int = 1) -> Tuple[int, int, int, int]:
+    """Return the (x0, y0, x1, y1) box around ``boxes`` grown by ``margin`` and clipped to ``shape``."""
+    b = np.asarray(boxes)
+    # Snap the corner so the crop's pyramid lines up with the full frame's
+    x0 = max(int(b[:, 0].min()) - margin, 0) // align * align
+    y0 = max(int(b[:, 1].min()) - margin, 0) // align * align
+    x1 = min(int((b[:, 0] + b[:, 2]).max()) + margin, shape[1])
+    y1 = min(int((b[:, 1] + b[:, 3]).max()) + margin, shape[0])
+    return x0, y0, x1, y1
@@ -11,16 +11,192 @@ import time
 import argparse
 import sys
 import os
+import queue
+import shutil
+import subprocess
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from datetime import datetime
 
+from numba_compat import njit, prange, NUMBA_AVAILABLE
+from screen_capture import make_capture_backend
+
+# Extra low-latency options for encoders that understand them
+FFMPEG_ENCODER_OPTIONS = {
+    "h264_nvenc": ["-preset", "p1", "-tune", "ull"],
+    "hevc_nvenc": ["-preset", "p1", "-tune", "ull"],
+}
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _compose_jit(out: np.ndarray, frame: np.ndarray, overlay: np.ndarray, alpha: np.ndarray):
+    """
+    Single pass over the pixels: ``frame`` where ``alpha`` is 0, the premultiplied
+    ``overlay`` blended over it by coverage elsewhere. ``frame`` may be the strided
+    BGR view of a BGRA grab, which fuses the alpha drop into the same pass.
+    """
+    for y in prange(alpha.shape[0]):
+        for x in range(alpha.shape[1]):
+            a = np.int32(alpha[y, x])
+            if a == 0:
+                out[y, x, 0] = frame[y, x, 0]
+                out[y, x, 1] = frame[y, x, 1]
+                out[y, x, 2] = frame[y, x, 2]
+            else:
+                for c in range(3):
+                    v = overlay[y, x, c] + (frame[y, x, c] * (255 - a) + 127) // 255
+                    out[y, x, c] = min(v, 255)
+
+
+def _compose(out: np.ndarray, frame: np.ndarray, overlay: np.ndarray, alpha: np.ndarray):
+    """
+    Write ``frame`` into ``out`` with ``overlay`` composited over it.
+    
+    ``overlay`` is premultiplied (drawn over black) and ``alpha`` is its uint8
+    coverage, so antialiased glyph edges blend into the frame instead of
+    being stamped as dark fringes.
+    """
+    if NUMBA_AVAILABLE:
+        _compose_jit(out, frame, overlay, alpha)
+        return
+    
+    # Without Numba: one copy pass, then blend only the covered pixels
+    if out is not frame:
+        np.copyto(out, frame)
+    ys, xs = np.nonzero(alpha)
+    a = alpha[ys, xs, None].astype(np.uint16)
+    blended = (out[ys, xs] * (255 - a) + 127) // 255 + overlay[ys, xs]
+    out[ys, xs] = np.minimum(blended, 255)
+
+
+def _warmup_jit():
+    """
+    Compile the Numba kernels before the first frame instead of during it, for
+    both frame layouts _compose sees (strided BGR view of a BGRA grab, packed BGR).
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    bgra = np.zeros((2, 2, 4), dtype=np.uint8)
+    out = np.zeros((2, 2, 3), dtype=np.uint8)
+    alpha = np.zeros((2, 2), dtype=np.uint8)
+    for frame in (bgra[:, :, :3], out.copy()):
+        _compose_jit(out, frame, out.copy(), alpha)
+
+
+@lru_cache(maxsize=None)
+def _ffmpeg_encoders() -> frozenset:
+    """Encoder names listed by ``ffmpeg -encoders`` (probed once per process)."""
+    if shutil.which("ffmpeg") is None:
+        return frozenset()
+    try:
+        result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"],
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return frozenset()
+    return frozenset(line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1)
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_has_encoder(codec: str) -> bool:
+    """
+    Return True if an ``ffmpeg`` binary on PATH can actually encode with ``codec``.
+    
+    ``ffmpeg -encoders`` lists hardware encoders (nvenc, qsv, ...) whenever the build
+    supports them, even without the GPU or driver, so listed encoders are confirmed
+    with a one-frame trial encode (probed once per codec).
+    """
+    if codec not in _ffmpeg_encoders():
+        return False
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", "nullsrc=s=256x256", "-frames:v", "1",
+        "-c:v", codec, *FFMPEG_ENCODER_OPTIONS.get(codec, []),
+        "-pix_fmt", "yuv420p", "-f", "null", "-"
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0
+
+
+class FFmpegWriter:
+    """cv2.VideoWriter look-alike that pipes raw frames to an ffmpeg process."""
+    
+    def __init__(self, output_path: str, fps: float, frame_size: Tuple[int, int],
+                 codec: str = "h264_nvenc", pix_fmt: str = "bgr24"):
+        """
+        Start the ffmpeg encoder process.
+        
+        Args:
+            output_path: Path for the output video file
+            fps: Frames per second of the input stream
+            frame_size: (width, height) of the frames that will be written
+            codec: FFmpeg encoder name (e.g. 'h264_nvenc', 'h264_vaapi', 'h264_videotoolbox')
+            pix_fmt: Raw input layout sent down the pipe: 'bgr24', 'bgra' (screen grabs
+                     as-is, converted by ffmpeg) or 'yuv420p' (converted by write(), on
+                     the calling thread; needs even width and height)
+        """
+        self.pix_fmt = pix_fmt
+        self.takes_bgra = pix_fmt != "bgr24"  # Feed BGRA grabs without converting them first
+        width, height = frame_size
+        
+        # I420 planes (Y, then U, then V) are half the bytes of BGR
+        self._yuv = None
+        if pix_fmt == "yuv420p":
+            if width % 2 or height % 2:
+                raise ValueError(f"yuv420p needs an even frame size, got {width}x{height}")
+            self._yuv = np.empty((height * 3 // 2, width), dtype=np.uint8)
+        
+        cmd = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", pix_fmt, "-s", f"{width}x{height}",
+            "-r", str(fps), "-i", "-",
+            "-c:v", codec, *FFMPEG_ENCODER_OPTIONS.get(codec, []),
+            "-pix_fmt", "yuv420p",
+            output_path
+        ]
+        try:
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        except OSError:
+            self._proc = None
+    
+    def isOpened(self) -> bool:
+        """Return True while the encoder process is running."""
+        return self._proc is not None and self._proc.poll() is None
+    
+    def write(self, frame: np.ndarray):
+        """Send one BGR or BGRA frame to the encoder."""
+        if self._yuv is not None:
+            code = cv2.COLOR_BGRA2YUV_I420 if frame.shape[2] == 4 else cv2.COLOR_BGR2YUV_I420
+            frame = cv2.cvtColor(frame, code, dst=self._yuv)
+        elif self.pix_fmt == "bgra" and frame.shape[2] == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+        
+        # Hand the pixel buffer over directly, without a tobytes() copy
+        self._proc.stdin.write(np.ascontiguousarray(frame).data)
+    
+    def release(self):
+        """Close the pipe and wait for ffmpeg to finish the file."""
+        if self._proc is None:
+            return
+        self._proc.stdin.close()
+        self._proc.wait()
+        self._proc = None
+
 
 class ScreenRecorder:
     """Record screen region and export as MP4 video."""
     
+    QUEUE_SIZE = 8  # Ring buffer slots between capture and the encoder thread
+    PREVIEW_MAX_HEIGHT = 720  # Taller captures are previewed downscaled
+    
     def __init__(self, output_path: str = None, fps: int = 30, 
-                 codec: str = "mp4v", screen_region: Optional[Dict] = None):
+                 codec: str = "mp4v", screen_region: Optional[Dict] = None,
+                 encoder: str = "opencv", ffmpeg_codec: str = "h264_nvenc",
+                 capture_backend: str = "auto"):
         """
         Initialize the screen recorder.
         
@@ -30,16 +206,41 @@ class ScreenRecorder:
             codec: Video codec to use (default: 'mp4v' for MP4)
             screen_region: Dictionary with 'top', 'left', 'width', 'height' for screen capture.
                           If None, user will select region.
+            encoder: 'opencv' for cv2.VideoWriter, or 'ffmpeg' to pipe frames to an
+                     ffmpeg process (falls back to OpenCV when the encoder is missing)
+            ffmpeg_codec: FFmpeg encoder used with encoder='ffmpeg' (default: 'h264_nvenc')
+            capture_backend: 'auto' (DXcam on Windows when installed, else mss), 'mss' or 'dxcam'
         """
         self.screen_region = screen_region
         self.fps = fps
         self.codec = codec
-        self.sct = None  # Lazy initialization
+        self._fourcc = cv2.VideoWriter_fourcc(*codec)  # Reused by every start_recording
+        self.encoder = encoder
+        self.ffmpeg_codec = ffmpeg_codec
+        self.sct = None  # Lazy initialization (region selection)
+        self.capture_backend = capture_backend
+        self._backend = None  # Created on first capture, once the region is known
+        self._last_bgra = None  # Full BGRA pixels behind the last captured frame
+        
+        # Annotators specialized per frame size (see _make_annotator)
+        self._annotators = {}
+        self._display_buf = None  # Reused preview frame
+        self._preview_buf = None  # Reused downscaled capture for the preview
         self.video_writer = None
         self.is_recording = False
         self.frames_recorded = 0
+        self.frames_dropped = 0  # Frames skipped because the encoder fell behind
         self.recording_start_time = None
         
+        # Encoding runs on its own thread, fed through a preallocated ring of
+        # frame slots; the two queues only trade slot indices
+        self._ring = None
+        self._free_slots = None
+        self._full_slots = None
+        self._writer_thread = None
+        self._writer_error = None  # Exception that stopped the encoder thread
+        self._frames_written = 0  # Frames the encoder thread actually wrote
+        
         # Set output path
         if output_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -87,20 +288,26 @@ class ScreenRecorder:
         return None
     
     def capture_frame(self) -> np.ndarray:
-        """Capture a frame from the selected screen region."""
+        """
+        Capture a frame from the selected screen region.
+        
+        The frame is a non-contiguous BGR view of the grabbed BGRA pixels;
+        copy it (``np.ascontiguousarray``) where OpenCV needs packed pixels.
+        """
         if self.screen_region is None:
             self.screen_region = self.select_screen_region()
             if self.screen_region is None:
                 raise ValueError("No screen region selected")
         
-        # Initialize mss if not already done
-        if self.sct is None:
-            self.sct = mss.mss()
+        # Initialize the capture backend if not already done
+        if self._backend is None:
+            self._backend = make_capture_backend(self.screen_region, self.fps, self.capture_backend)
         
-        screenshot = self.sct.grab(self.screen_region)
-        frame = np.array(screenshot)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-        return frame
+        # Drop alpha by slicing: no conversion pass here, consumers pack the
+        # pixels while copying them
+        bgra = self._backend.grab()
+        self._last_bgra = bgra  # Lets record_frame send BGRA-capable writers the raw grab
+        return bgra[:, :, :3]
     
     def start_recording(self):
         """Start recording video."""
@@ -115,25 +322,98 @@ class ScreenRecorder:
                 raise ValueError("No screen region selected")
         
         # Initialize video writer
-        fourcc = cv2.VideoWriter_fourcc(*self.codec)
         width = self.screen_region['width']
         height = self.screen_region['height']
-        
-        self.video_writer = cv2.VideoWriter(
-            self.output_path,
-            fourcc,
-            self.fps,
-            (width, height)
-        )
+        self.video_writer = self._open_writer(width, height)
         
         if not self.video_writer.isOpened():
             raise RuntimeError("Failed to initialize video writer")
+        channels = 4 if getattr(self.video_writer, "takes_bgra", False) else 3
+        
+        # Encode on a background thread so capture and display never wait for it
+        self._ring = np.empty((self.QUEUE_SIZE, height, width, channels), dtype=np.uint8)
+        self._free_slots = queue.Queue()
+        self._full_slots = queue.Queue()
+        for slot in range(self.QUEUE_SIZE):
+            self._free_slots.put(slot)
+        self._writer_error = None
+        self._frames_written = 0
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop,
+            args=(self._ring, self._free_slots, self._full_slots, self.video_writer),
+            daemon=True)
+        self._writer_thread.start()
         
         self.is_recording = True
         self.frames_recorded = 0
+        self.frames_dropped = 0
         self.recording_start_time = time.time()
         print(f"Recording started: {self.output_path}")
     
+    def _open_writer(self, width: int, height: int):
+        """Create the configured video writer, falling back to cv2.VideoWriter."""
+        if self.encoder == "ffmpeg":
+            if ffmpeg_has_encoder(self.ffmpeg_codec):
+                # Convert BGRA grabs to I420 on the writer thread, halving the bytes
+                # piped to the encoder; odd sizes can't be 4:2:0, so ffmpeg converts those
+                pix_fmt = "yuv420p" if width % 2 == 0 and height % 2 == 0 else "bgra"
+                return FFmpegWriter(self.output_path, self.fps, (width, height),
+                                    self.ffmpeg_codec, pix_fmt=pix_fmt)
+            print(f"FFmpeg encoder '{self.ffmpeg_codec}' not available, using OpenCV ({self.codec})")
+        
+        return cv2.VideoWriter(
+            self.output_path,
+            self._fourcc,
+            self.fps,
+            (width, height)
+        )
+    
+    def _writer_loop(self, ring: np.ndarray, free_slots: queue.Queue, full_slots: queue.Queue, writer):
+        """
+        Encoder thread: write filled slots, then recycle them, until the None sentinel arrives.
+        
+        A failed write is kept in ``_writer_error`` for the recording thread to raise;
+        later slots are recycled unwritten so record_frame never waits on a dead encoder.
+        """
+        while True:
+            slot = full_slots.get()
+            if slot is None:
+                break
+            if self._writer_error is None:
+                try:
+                    writer.write(ring[slot])
+                    self._frames_written += 1
+                except Exception as e:
+                    self._writer_error = e
+            free_slots.put(slot)
+    
+    def _stop_writer(self):
+        """Flush the queued frames, stop the encoder thread and release the writer."""
+        if self._writer_thread is not None:
+            self._full_slots.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+            self._ring = self._free_slots = self._full_slots = None
+        
+        if self.video_writer is not None:
+            try:
+                self.video_writer.release()
+            except Exception as e:
+                # e.g. a broken pipe to an ffmpeg process that already exited
+                if self._writer_error is None:
+                    self._writer_error = e
+            self.video_writer = None
+        
+        # Only frames the encoder accepted count as recorded
+        self.frames_recorded = self._frames_written
+    
+    def _raise_writer_error(self):
+        """Raise the encoder thread's exception, if any, as a RuntimeError."""
+        error, self._writer_error = self._writer_error, None
+        if error is not None:
+            raise RuntimeError(f"Video writer failed after {self._frames_written} frames: "
+                               f"{error}") from error
+    
     def stop_recording(self):
         """Stop recording and save video."""
         if not self.is_recording:
@@ -141,53 +421,141 @@ class ScreenRecorder:
             return
         
         self.is_recording = False
-        
-        if self.video_writer is not None:
-            self.video_writer.release()
-            self.video_writer = None
+        self._stop_writer()
+        self._raise_writer_error()
         
         duration = time.time() - self.recording_start_time if self.recording_start_time else 0
         print(f"\nRecording stopped!")
         print(f"  Frames recorded: {self.frames_recorded}")
+        if self.frames_dropped:
+            print(f"  Frames dropped: {self.frames_dropped}")
         print(f"  Duration: {duration:.2f} seconds")
         print(f"  Video saved to: {os.path.abspath(self.output_path)}")
     
+    def cancel_recording(self):
+        """Stop recording and delete the incomplete video file."""
+        if not self.is_recording:
+            return
+        
+        self.is_recording = False
+        self._stop_writer()
+        self._writer_error = None  # The file is discarded anyway
+        
+        # Remove the incomplete video file
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+        print("Recording cancelled")
+    
     def record_frame(self, frame: np.ndarray):
-        """Record a single frame to the video."""
+        """Copy a single frame into a free ring slot and hand it to the encoder thread."""
         if self.is_recording and self.video_writer is not None:
-            self.video_writer.write(frame)
+            if self._writer_error is not None:
+                # The encoder died: end the recording instead of queueing more frames
+                self.is_recording = False
+                self._stop_writer()
+                self._raise_writer_error()
+            
+            height, width, channels = self._ring.shape[1:]
+            if frame.shape[:2] != (height, width):
+                raise ValueError(f"Frame size {frame.shape[1]}x{frame.shape[0]} does not match "
+                                 f"the recording size {width}x{height}")
+            
+            try:
+                slot = self._free_slots.get(timeout=1.0)
+            except queue.Empty:
+                # Encoder stalled: drop the frame rather than freeze capture
+                self.frames_dropped += 1
+                return
+            
+            # The copy into the slot also packs strided capture views
+            out = self._ring[slot]
+            from_grab = self._last_bgra is not None and np.may_share_memory(frame, self._last_bgra)
+            if channels == 4:
+                if from_grab:
+                    np.copyto(out, self._last_bgra)  # BGRA writer: the untouched grab
+                else:
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA, dst=out)
+            elif from_grab:
+                # OpenCV's SIMD (SSE/AVX2/NEON) shuffle packs BGRA to BGR far faster
+                # than NumPy's element-wise strided copy
+                cv2.cvtColor(self._last_bgra, cv2.COLOR_BGRA2BGR, dst=out)
+            else:
+                np.copyto(out, frame)
+            
+            self._full_slots.put(slot)
             self.frames_recorded += 1
     
-    def annotate_frame(self, frame: np.ndarray) -> np.ndarray:
+    def annotate_frame(self, frame: np.ndarray, inplace: bool = False,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Annotate the frame with recording status and controls.
         
         Args:
             frame: Input frame
+            inplace: Draw directly into ``frame`` instead of a copy (only valid
+                     once the frame has been recorded and is no longer needed)
+            out: Contiguous buffer of the frame's shape to draw into instead of a
+                 new array (lets a display loop reuse one buffer)
             
         Returns:
             Annotated frame
         """
-        annotated = frame.copy()
+        h, w = frame.shape[:2]
+        annotate = self._annotators.get((h, w))
+        if annotate is None:
+            annotate = self._annotators[(h, w)] = self._make_annotator(h, w)
         
-        # Recording indicator
-        if self.is_recording:
-            # Red recording dot
-            cv2.circle(annotated, (20, 20), 10, (0, 0, 255), -1)
-            
-            # Recording text
-            cv2.putText(annotated, "REC", (40, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            
-            # Frame counter
-            duration = time.time() - self.recording_start_time if self.recording_start_time else 0
-            text = f"Time: {duration:.1f}s | Frames: {self.frames_recorded}"
-            cv2.putText(annotated, text, (100, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        # OpenCV cannot draw into strided views such as capture_frame's output,
+        # so those always get a packed output buffer
+        if inplace and frame.flags.c_contiguous:
+            annotated = frame
+        elif out is not None and out.shape == (h, w, 3):
+            annotated = out
         else:
-            # Ready to record indicator
-            cv2.putText(annotated, "Ready", (20, 30),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            annotated = np.empty((h, w, 3), dtype=np.uint8)
+        
+        duration = time.time() - self.recording_start_time if self.recording_start_time else 0
+        return annotate(frame, annotated, self.is_recording, duration, self.frames_recorded)
+    
+    def _make_annotator(self, h: int, w: int):
+        """
+        Build an annotate function specialized for h x w frames.
+        
+        Overlays, text position and drawing constants are bound once, so the
+        returned ``annotate(frame, out, recording, duration, frames)`` only
+        composes the frame and draws the counter.
+        """
+        overlays = self._render_overlays(h, w)
+        put_text = cv2.putText
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        counter_org = (100, 30)
+        white = (255, 255, 255)
+        
+        def annotate(frame, out, recording, duration, frames):
+            # Copy and stamp the status indicator and instructions in one pass
+            overlay, alpha = overlays[recording]
+            _compose(out, frame, overlay, alpha)
+            
+            if recording:
+                # Frame counter: the only text drawn per frame
+                put_text(out, f"Time: {duration:.1f}s | Frames: {frames}", counter_org,
+                         font, 0.6, white, 2)
+            return out
+        
+        return annotate
+    
+    @staticmethod
+    def _render_overlays(h: int, w: int) -> Dict[bool, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Rasterize the constant overlays for an h x w frame, keyed by is_recording.
+        
+        Each overlay is a (layer, alpha) pair: the layer is drawn over black and
+        alpha holds the same drawing in white, i.e. each pixel's coverage, which
+        keeps the antialiased edges for _compose to blend.
+        """
+        def put_text(layer, alpha, text, org, scale, color, thickness):
+            cv2.putText(layer, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            cv2.putText(alpha, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, 255, thickness)
         
         # Display instructions at the bottom
         instructions = [
@@ -195,39 +563,69 @@ class ScreenRecorder:
             "Q: Quit and Export",
             "ESC: Cancel and Quit"
         ]
-        
-        y_offset = frame.shape[0] - 15 - (len(instructions) * 25)
+        base = np.zeros((h, w, 3), dtype=np.uint8)
+        base_alpha = np.zeros((h, w), dtype=np.uint8)
+        y_offset = h - 15 - (len(instructions) * 25)
         for i, instruction in enumerate(instructions):
-            cv2.putText(annotated, instruction, (10, y_offset + i * 25),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            put_text(base, base_alpha, instruction, (10, y_offset + i * 25), 0.5, (255, 255, 255), 1)
         
-        return annotated
+        # Recording indicator: red dot + "REC"
+        rec, rec_alpha = base.copy(), base_alpha.copy()
+        cv2.circle(rec, (20, 20), 10, (0, 0, 255), -1)
+        cv2.circle(rec_alpha, (20, 20), 10, 255, -1)
+        put_text(rec, rec_alpha, "REC", (40, 30), 0.7, (0, 0, 255), 2)
+        
+        # Ready to record indicator
+        ready, ready_alpha = base, base_alpha
+        put_text(ready, ready_alpha, "Ready", (20, 30), 0.7, (0, 255, 0), 2)
+        
+        return {True: (rec, rec_alpha), False: (ready, ready_alpha)}
     
-    def run(self):
-        """Main loop to run the screen recorder."""
+    def run(self, preview: bool = True):
+        """
+        Main loop to run the screen recorder.
+        
+        Args:
+            preview: Show the annotated preview window with keyboard controls.
+                     When False, recording starts immediately without any window
+                     and stops on 'q' + ENTER in the terminal or Ctrl+C.
+        """
         print("=" * 60)
         print("  Screen Recorder")
         print("=" * 60)
         print()
-        print("Controls:")
-        print("  SPACE: Start/Stop recording")
-        print("  Q: Quit and export video")
-        print("  ESC: Cancel and quit without saving")
+        if preview:
+            print("Controls:")
+            print("  SPACE: Start/Stop recording")
+            print("  Q: Quit and export video")
+            print("  ESC: Cancel and quit without saving")
+        else:
+            print("Recording without preview.")
+            print("  Type q + ENTER (or press Ctrl+C) to stop and export video")
         print()
         
         try:
+            if not preview:
+                self._record_headless()
+                return
+            
+            # Pay JIT compilation (or cache loading) before the window opens
+            _warmup_jit()
+            
             # Create window that stays on top
             window_name = "Screen Recorder"
             cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
             cv2.setWindowProperty(window_name, cv2.WND_PROP_TOPMOST, 1)
             
-            # Calculate wait time for cv2.waitKey based on FPS
-            wait_time = int(1000.0 / self.fps)  # milliseconds
+            # Pace frames against a monotonic deadline so capture, encode and
+            # display time are subtracted from the wait
+            frame_period = 1.0 / self.fps
+            deadline = time.monotonic()
+            
+            # Non-blocking key polling (OpenCV >= 4.5); older builds block for 1 ms
+            poll_key = getattr(cv2, "pollKey", None) or (lambda: cv2.waitKey(1))
             
             while True:
-                # Track timing for accurate frame rate
-                loop_start = time.time()
-                
                 # Capture frame
                 frame = self.capture_frame()
                 
@@ -235,14 +633,25 @@ class ScreenRecorder:
                 if self.is_recording:
                     self.record_frame(frame)
                 
-                # Annotate frame
-                annotated = self.annotate_frame(frame)
+                # Annotate a downscaled copy into the persistent preview buffer; the
+                # frame itself has already been queued for recording at full resolution
+                preview_frame = self._shrink_for_preview(frame)
+                if self._display_buf is None or self._display_buf.shape != preview_frame.shape:
+                    self._display_buf = np.empty(preview_frame.shape, dtype=np.uint8)
+                annotated = self.annotate_frame(preview_frame, out=self._display_buf)
                 
                 # Display
                 cv2.imshow(window_name, annotated)
                 
-                # Handle keyboard input with frame-rate-appropriate timeout
-                key = cv2.waitKey(wait_time) & 0xFF
+                # Handle keyboard input without blocking, then sleep until the next frame slot
+                key = poll_key() & 0xFF
+                
+                deadline += frame_period
+                now = time.monotonic()
+                if now - deadline > 2 * frame_period:
+                    deadline = now  # Fell too far behind: drop the backlog instead of bursting
+                elif deadline > now:
+                    time.sleep(deadline - now)
                 
                 if key == ord('q'):
                     # Stop recording if active and quit
@@ -252,15 +661,7 @@ class ScreenRecorder:
                     break
                 elif key == 27:  # ESC key
                     # Cancel recording and quit
-                    if self.is_recording:
-                        self.is_recording = False
-                        if self.video_writer is not None:
-                            self.video_writer.release()
-                            self.video_writer = None
-                        # Remove the incomplete video file
-                        if os.path.exists(self.output_path):
-                            os.remove(self.output_path)
-                        print("Recording cancelled")
+                    self.cancel_recording()
                     print("Exiting without saving...")
                     break
                 elif key == 32:  # SPACE key
@@ -274,9 +675,60 @@ class ScreenRecorder:
             if self.is_recording:
                 self.stop_recording()
         finally:
-            if self.video_writer is not None:
-                self.video_writer.release()
+            self._stop_writer()
+            if self._backend is not None:
+                self._backend.close()
+                self._backend = None
             cv2.destroyAllWindows()
+    
+    def _shrink_for_preview(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale ``frame`` with INTER_AREA to at most PREVIEW_MAX_HEIGHT rows."""
+        h, w = frame.shape[:2]
+        if h <= self.PREVIEW_MAX_HEIGHT:
+            return frame
+        
+        # Resize the packed BGRA grab when there is one: OpenCV would first copy
+        # the strided BGR view into a temporary
+        src = frame
+        if self._last_bgra is not None and np.may_share_memory(frame, self._last_bgra):
+            src = self._last_bgra
+        
+        size = (max(1, round(w * self.PREVIEW_MAX_HEIGHT / h)), self.PREVIEW_MAX_HEIGHT)
+        shape = (size[1], size[0], src.shape[2])
+        if self._preview_buf is None or self._preview_buf.shape != shape:
+            self._preview_buf = np.empty(shape, dtype=np.uint8)
+        cv2.resize(src, size, dst=self._preview_buf, interpolation=cv2.INTER_AREA)
+        return self._preview_buf[:, :, :3]
+    
+    def _record_headless(self):
+        """Capture and record until 'q' is entered on stdin: no annotation, no display."""
+        stop = threading.Event()
+        
+        def wait_for_quit():
+            for line in sys.stdin:
+                if line.strip().lower() == "q":
+                    stop.set()
+                    return
+        
+        threading.Thread(target=wait_for_quit, daemon=True).start()
+        self.start_recording()
+        
+        # Same monotonic-deadline pacing as the preview loop; waiting on the
+        # event lets a quit request interrupt the sleep
+        frame_period = 1.0 / self.fps
+        deadline = time.monotonic()
+        while not stop.is_set():
+            self.record_frame(self.capture_frame())
+            
+            deadline += frame_period
+            now = time.monotonic()
+            if now - deadline > 2 * frame_period:
+                deadline = now  # Fell too far behind: drop the backlog instead of bursting
+            elif deadline > now:
+                stop.wait(deadline - now)
+        
+        self.stop_recording()
+        print("Exiting...")
 
 
 def main():
@@ -297,6 +749,12 @@ Examples:
   
   # Record with custom codec
   python screen_recorder.py --codec avc1
+  
+  # Encode on the GPU through ffmpeg (NVENC, VA-API, VideoToolbox...)
+  python screen_recorder.py --encoder ffmpeg --ffmpeg-codec h264_nvenc
+  
+  # Record a fixed region without preview window (type q + ENTER to stop)
+  python screen_recorder.py --no-preview --region 0 0 1280 720
 
 Controls during recording:
   SPACE: Start/Stop recording
@@ -310,19 +768,38 @@ Controls during recording:
                        help="Frames per second for recording (default: 30)")
     parser.add_argument("--codec", default="mp4v",
                        help="Video codec to use (default: mp4v)")
+    parser.add_argument("--encoder", choices=["opencv", "ffmpeg"], default="opencv",
+                       help="Encoding backend (default: opencv)")
+    parser.add_argument("--ffmpeg-codec", default="h264_nvenc",
+                       help="FFmpeg encoder for --encoder ffmpeg (default: h264_nvenc)")
+    parser.add_argument("--backend", choices=["auto", "mss", "dxcam"], default="auto",
+                       help="Screen capture backend (default: auto, DXcam on Windows when installed)")
+    parser.add_argument("--region", type=int, nargs=4, metavar=("LEFT", "TOP", "WIDTH", "HEIGHT"),
+                       help="Screen region to record (default: select interactively)")
+    parser.add_argument("--no-preview", action="store_true",
+                       help="Record immediately without preview window (stop with q + ENTER or Ctrl+C)")
     
     args = parser.parse_args()
     
+    screen_region = None
+    if args.region:
+        left, top, width, height = args.region
+        screen_region = {"top": top, "left": left, "width": width, "height": height}
+    
     try:
         # Create recorder
         recorder = ScreenRecorder(
             output_path=args.output,
             fps=args.fps,
-            codec=args.codec
+            codec=args.codec,
+            encoder=args.encoder,
+            ffmpeg_codec=args.ffmpeg_codec,
+            capture_backend=args.backend,
+            screen_region=screen_region
         )
         
         # Run the recorder
-        recorder.run()
+        recorder.run(preview=not args.no_preview)
         
         return 0
         
@@ -139,6 +139,56 @@ class TestScreenRecorder(unittest.TestCase):
         # Check that file has content
         self.assertGreater(os.path.getsize(self.test_output), 0)
     
+    def test_record_frame_wrong_size(self):
+        """Test that frames not matching the recording size are rejected."""
+        recorder = ScreenRecorder(
+            output_path=self.test_output,
+            screen_region=self.test_region
+        )
+        
+        recorder.start_recording()
+        
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        with self.assertRaises(ValueError):
+            recorder.record_frame(frame)
+        
+        self.assertEqual(recorder.frames_recorded, 0)
+        
+        recorder.stop_recording()
+    
+    def test_writer_error_is_raised(self):
+        """Test that a failing video writer is reported instead of silently losing frames."""
+        class FailingWriter:
+            """Writer that accepts two frames, then fails like a full disk."""
+            def __init__(self):
+                self.written = 0
+            def isOpened(self):
+                return True
+            def write(self, frame):
+                if self.written == 2:
+                    raise OSError("No space left on device")
+                self.written += 1
+            def release(self):
+                pass
+        
+        recorder = ScreenRecorder(
+            output_path=self.test_output,
+            screen_region=self.test_region
+        )
+        recorder._open_writer = lambda width, height: FailingWriter()
+        
+        recorder.start_recording()
+        
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        with self.assertRaises(RuntimeError):
+            for i in range(5):
+                recorder.record_frame(frame)
+            recorder.stop_recording()
+        
+        # Only the frames the writer accepted count as recorded
+        self.assertFalse(recorder.is_recording)
+        self.assertEqual(recorder.frames_recorded, 2)
+    
     def test_annotate_frame_not_recording(self):
         """Test frame annotation when not recording."""
         recorder = ScreenRecorder(
@@ -8,18 +8,22 @@ import numpy as np
 import os
 import tempfile
 import shutil
+import atexit
+from functools import lru_cache
 from video_to_images import VideoToImages
 
 
-def create_test_video(filename, num_frames=30, fps=10, width=320, height=240):
+def create_test_video(filename, num_frames=30, fps=10, width=320, height=240, codec='mp4v'):
     """Create a simple test video with frame numbers displayed."""
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    fourcc = cv2.VideoWriter_fourcc(*codec)
     out = cv2.VideoWriter(filename, fourcc, fps, (width, height))
     
+    # One frame buffer, fully repainted every iteration
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    
     for i in range(num_frames):
-        # Create frame with gradient background
-        frame = np.zeros((height, width, 3), dtype=np.uint8)
-        frame[:, :] = (i * 8 % 255, (i * 5) % 255, (i * 3) % 255)
+        # Solid background changing color with the frame index
+        frame[:] = (i * 8 % 255, (i * 5) % 255, (i * 3) % 255)
         
         # Add frame number
         text = f"Frame {i}"
@@ -32,6 +36,25 @@ def create_test_video(filename, num_frames=30, fps=10, width=320, height=240):
     print(f"Created test video: {filename} with {num_frames} frames")
 
 
+@lru_cache(maxsize=None)
+def _fixture_dir():
+    """Directory shared by the whole test run, removed at exit."""
+    path = tempfile.mkdtemp(prefix="video_to_images_test_")
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+@lru_cache(maxsize=None)
+def fixture_video(num_frames):
+    """
+    Path to a test video with ``num_frames`` frames, encoded once per test run.
+    MJPEG is intra-only, so it is cheap to encode and to decode.
+    """
+    video_path = os.path.join(_fixture_dir(), f"test_video_{num_frames}.avi")
+    create_test_video(video_path, num_frames=num_frames, codec='MJPG')
+    return video_path
+
+
 def test_basic_extraction():
     """Test basic frame extraction."""
     print("\n" + "=" * 60)
@@ -39,9 +62,8 @@ def test_basic_extraction():
     print("=" * 60)
     
     with tempfile.TemporaryDirectory() as tmpdir:
-        # Create test video
-        video_path = os.path.join(tmpdir, "test_video.mp4")
-        create_test_video(video_path, num_frames=30)
+        # Shared test video
+        video_path = fixture_video(30)
         
         # Extract frames
         output_dir = os.path.join(tmpdir, "frames")
@@ -67,9 +89,8 @@ def test_step_extraction():
     print("=" * 60)
     
     with tempfile.TemporaryDirectory() as tmpdir:
-        # Create test video
-        video_path = os.path.join(tmpdir, "test_video.mp4")
-        create_test_video(video_path, num_frames=50)
+        # Shared test video
+        video_path = fixture_video(50)
         
         # Extract every 5th frame
         output_dir = os.path.join(tmpdir, "frames")
@@ -91,9 +112,8 @@ def test_range_extraction():
     print("=" * 60)
     
     with tempfile.TemporaryDirectory() as tmpdir:
-        # Create test video
-        video_path = os.path.join(tmpdir, "test_video.mp4")
-        create_test_video(video_path, num_frames=30)
+        # Shared test video
+        video_path = fixture_video(30)
         
         # Extract frames 10-20
         output_dir = os.path.join(tmpdir, "frames")
@@ -115,9 +135,8 @@ def test_max_frames():
     print("=" * 60)
     
     with tempfile.TemporaryDirectory() as tmpdir:
-        # Create test video
-        video_path = os.path.join(tmpdir, "test_video.mp4")
-        create_test_video(video_path, num_frames=50)
+        # Shared test video
+        video_path = fixture_video(50)
         
         # Extract max 15 frames
         output_dir = os.path.join(tmpdir, "frames")
@@ -138,9 +157,8 @@ def test_specific_frames():
     print("=" * 60)
     
     with tempfile.TemporaryDirectory() as tmpdir:
-        # Create test video
-        video_path = os.path.join(tmpdir, "test_video.mp4")
-        create_test_video(video_path, num_frames=30)
+        # Shared test video
+        video_path = fixture_video(30)
         
         # Extract specific frames
         output_dir = os.path.join(tmpdir, "frames")
@@ -162,9 +180,8 @@ def test_jpg_format():
     print("=" * 60)
     
     with tempfile.TemporaryDirectory() as tmpdir:
-        # Create test video
-        video_path = os.path.join(tmpdir, "test_video.mp4")
-        create_test_video(video_path, num_frames=10)
+        # Shared test video
+        video_path = fixture_video(10)
         
         # Extract as JPG
         output_dir = os.path.join(tmpdir, "frames")
@@ -182,10 +199,44 @@ def test_jpg_format():
         return True
 
 
+def test_parallel_extraction():
+    """Test extraction split across processes."""
+    print("\n" + "=" * 60)
+    print("Test 7: Parallel Extraction (every 3rd frame, 3 processes)")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Shared test video
+        video_path = fixture_video(30)
+        
+        # Extract every 3rd frame with 3 processes
+        output_dir = os.path.join(tmpdir, "frames")
+        converter = VideoToImages(video_path, output_dir=output_dir)
+        extracted = converter.extract_frames_parallel(step=3, num_processes=3)
+        
+        # Sequential extraction of the same frames, for reference
+        sequential_dir = os.path.join(tmpdir, "sequential")
+        VideoToImages(video_path, output_dir=sequential_dir).extract_frames(step=3)
+        
+        # Verify: same frames as a sequential extraction
+        expected = [f"frame_{n:06d}.png" for n in range(0, 30, 3)]
+        assert extracted == len(expected), f"Expected {len(expected)} frames, got {extracted}"
+        assert sorted(os.listdir(output_dir)) == expected, "Unexpected extracted files"
+        
+        # Verify: chunks seeked to mid-video decode the same pixels
+        for name in expected:
+            parallel = cv2.imread(os.path.join(output_dir, name))
+            sequential = cv2.imread(os.path.join(sequential_dir, name))
+            assert np.array_equal(parallel, sequential), f"{name} differs from sequential extraction"
+        
+        print(f"✓ Parallel extraction test passed (extracted {extracted} frames)")
+        return True
+
+
 def test_file_not_found():
     """Test handling of non-existent video file."""
     print("\n" + "=" * 60)
-    print("Test 7: File Not Found Error Handling")
+    print("Test 8: File Not Found Error Handling")
     print("=" * 60)
     
     try:
@@ -210,6 +261,7 @@ def main():
         ("Max Frames", test_max_frames),
         ("Specific Frames", test_specific_frames),
         ("JPG Format", test_jpg_format),
+        ("Parallel Extraction", test_parallel_extraction),
         ("File Not Found", test_file_not_found),
     ]
     
@@ -5,18 +5,290 @@ Extracts frames from video files and saves them as individual images.
 """
 
 import cv2
+import numpy as np
 import os
 import argparse
+import multiprocessing
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 from typing import Optional, List
 
+try:
+    import av  # Optional: multi-threaded FFmpeg decoding (backend="pyav")
+except ImportError:
+    av = None
+
+try:
+    from turbojpeg import TurboJPEG, TJSAMP_420  # Optional: JPEG straight from YUV planes
+except ImportError:
+    TurboJPEG = None
+
+
+# --hwaccel names -> cv2.VIDEO_ACCELERATION_* attribute (OpenCV >= 4.5.2)
+HW_ACCELERATIONS = {
+    "any": "VIDEO_ACCELERATION_ANY",
+    "d3d11": "VIDEO_ACCELERATION_D3D11",
+    "vaapi": "VIDEO_ACCELERATION_VAAPI",
+    "mfx": "VIDEO_ACCELERATION_MFX",
+}
+
+
+def _open_video_capture(video_path: str, hwaccel: Optional[str] = None):
+    """
+    Open ``video_path`` with OpenCV, decoding on the GPU through FFmpeg when
+    ``hwaccel`` is set and this OpenCV build supports it.
+    
+    Returns:
+        cv2.VideoCapture (software decoding if hardware setup failed)
+    """
+    if hwaccel is not None:
+        accel = getattr(cv2, HW_ACCELERATIONS[hwaccel], None)
+        if accel is not None and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, accel,
+                                    cv2.CAP_PROP_HW_DEVICE, 0])
+            if cap.isOpened():
+                return cap
+            cap.release()
+        print(f"Hardware decoding ({hwaccel}) unavailable, decoding on the CPU")
+    return cv2.VideoCapture(video_path)
+
+
+class _PyAVCapture:
+    """Minimal cv2.VideoCapture look-alike over PyAV, decoding on several threads."""
+    
+    def __init__(self, video_path: str):
+        self._container = av.open(video_path)
+        self._stream = self._container.streams.video[0]
+        # Let libavcodec pick frame and/or slice threading across all cores
+        self._stream.thread_type = "AUTO"
+        self._stream.thread_count = os.cpu_count() or 1
+        self._frames = self._container.decode(self._stream)
+        self._frame = None
+    
+    def isOpened(self) -> bool:
+        return self._container is not None
+    
+    def get(self, prop: int) -> float:
+        """Answer the few cv2.CAP_PROP_* queries the extractor makes."""
+        stream = self._stream
+        if prop == cv2.CAP_PROP_FPS:
+            return float(stream.average_rate or 0)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(stream.codec_context.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(stream.codec_context.height)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            if stream.frames:
+                return float(stream.frames)
+            # Some containers don't store a frame count: estimate it from the duration
+            if stream.duration and stream.average_rate:
+                return float(round(stream.duration * stream.time_base * stream.average_rate))
+            return 0.0
+        return 0.0
+    
+    def grab(self) -> bool:
+        """Decode the next frame, leaving it in its native (YUV) format."""
+        self._frame = next(self._frames, None)
+        return self._frame is not None
+    
+    def retrieve(self, image=None):
+        """Convert the last grabbed frame to a BGR array (``image`` is accepted for
+        cv2 compatibility; PyAV always returns a new array)."""
+        if self._frame is None:
+            return False, image
+        return True, self._frame.to_ndarray(format="bgr24")
+    
+    def retrieve_yuv420(self):
+        """Return the last grabbed frame as an I420 array of shape (H * 3 // 2, W)."""
+        if self._frame is None:
+            return False, None
+        return True, self._frame.to_ndarray(format="yuv420p")
+    
+    def release(self):
+        if self._container is not None:
+            self._container.close()
+            self._container = None
+
+
+# Flags for image files written with os.open (O_BINARY only exists on Windows)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_file(path: str, data):
+    """Write the bytes-like ``data`` to ``path`` with raw os-level calls."""
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data).cast("B")
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _write_image(path: str, frame, ext: str, params: List[int]):
+    """
+    Encode ``frame`` in memory with cv2.imencode and write the bytes with os.write,
+    bypassing cv2.imwrite's path handling and any Python file object.
+    
+    Args:
+        path: Output image path
+        frame: Image array
+        ext: Encoder extension ('.png' or '.jpg')
+        params: cv2.imencode encoder parameters
+    """
+    ok, buf = cv2.imencode(ext, frame, params)
+    if not ok:
+        raise RuntimeError(f"Failed to encode image: {path}")
+    _write_file(path, buf)
+
+
+class _FrameWriterPool:
+    """Encode and write images on writer threads fed by a bounded queue."""
+    
+    # Minimum number of frames waiting in the queue before decoding blocks
+    QUEUE_SIZE = 8
+    
+    def __init__(self, num_workers: int, ext: str = ".png",
+                 params: Optional[List[int]] = None):
+        """
+        Args:
+            num_workers: Number of writer threads; 0 writes synchronously
+            ext: Image format extension ('.png' or '.jpg')
+            params: cv2.imencode encoder parameters
+        """
+        self._ext = ext
+        self._params = params or []
+        # Backpressure: the decode loop blocks once the queue is full
+        self._queue = queue.Queue(maxsize=max(self.QUEUE_SIZE, 2 * num_workers))
+        self._errors = []
+        self._threads = [threading.Thread(target=self._writer_loop, daemon=True)
+                         for _ in range(num_workers)]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, path: str, frame, write=None, copy: bool = True):
+        """
+        Queue ``frame`` to be written to ``path``.
+        
+        Args:
+            path: Output image path
+            frame: Image array
+            write: Optional ``write(path, frame)`` replacing the default encoder
+            copy: Whether the reader will reuse ``frame``'s buffer for a later frame,
+                  in which case a queued frame must be copied; pass False for
+                  freshly allocated frames to hand them over as-is
+        """
+        if write is None:
+            write = self._write
+        if not self._threads:
+            write(path, frame)
+            return
+        
+        self._queue.put((write, path, frame.copy() if copy else frame))
+    
+    def _write(self, path: str, frame):
+        _write_image(path, frame, self._ext, self._params)
+    
+    def _writer_loop(self):
+        """Consume queued frames until the None sentinel."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            write, path, frame = item
+            try:
+                # Both encoders release the GIL, so writers overlap with decoding
+                write(path, frame)
+            except Exception as e:
+                self._errors.append(e)
+    
+    def close(self):
+        """Wait for all pending writes; re-raise the first write error, if any."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+
+class _ProgressLine:
+    """Progress line overwritten in place, rate-limited and silent when stdout isn't a terminal."""
+    
+    def __init__(self, interval: float = 0.1):
+        """
+        Args:
+            interval: Minimum number of seconds between two updates
+        """
+        self._interval = interval
+        self._enabled = getattr(sys.stdout, "isatty", lambda: False)()
+        self._next_update = 0.0
+    
+    def update(self, extracted_count: int):
+        if not self._enabled:
+            return
+        now = time.monotonic()
+        if now < self._next_update:
+            return
+        self._next_update = now + self._interval
+        print(f"Extracted {extracted_count} frames...", end='\r', flush=True)
+
+
+def _extract_chunk(video_path: str, path_tmpl: str, ext: str, encode_params: List[int],
+                   chunk_start: int, chunk_end: int, step: int,
+                   hwaccel: Optional[str] = None) -> int:
+    """
+    Extract every ``step``-th frame of [chunk_start, chunk_end) with a capture of its own,
+    frame n going to ``path_tmpl % n``. Top-level so multiprocessing can pickle it.
+    
+    Returns:
+        Number of frames written
+    """
+    cap = _open_video_capture(video_path, hwaccel)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open video file: {video_path}")
+    
+    extracted_count = 0
+    frame_buf = None
+    try:
+        # OpenCV seeks to the keyframe before chunk_start and decodes up to it
+        if chunk_start > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, chunk_start)
+        
+        for frame_count in range(chunk_start, chunk_end):
+            if not cap.grab():
+                break
+            if (frame_count - chunk_start) % step:
+                continue
+            ret, frame_buf = cap.retrieve(frame_buf)
+            if not ret:
+                break
+            _write_image(path_tmpl % frame_count, frame_buf, ext, encode_params)
+            extracted_count += 1
+    finally:
+        cap.release()
+    
+    return extracted_count
+
 
 class VideoToImages:
     """Convert video files to individual image frames."""
     
+    # Requested frames at most this far ahead are reached by decoding forward;
+    # beyond it a seek (keyframe + re-decode) is cheaper
+    SEEK_THRESHOLD = 60
+    
     def __init__(self, video_path: str, output_dir: str = None, 
-                 format: str = "png", prefix: str = "frame"):
+                 format: str = "png", prefix: str = "frame",
+                 num_workers: Optional[int] = None,
+                 png_compression: int = 1, jpeg_quality: int = 90,
+                 backend: str = "cv2", hwaccel: Optional[str] = None):
         """
         Initialize the video to images converter.
         
@@ -25,10 +297,19 @@ class VideoToImages:
             output_dir: Directory to save extracted frames (default: video_name_frames/)
             format: Output image format ('png' or 'jpg', default: 'png')
             prefix: Prefix for output filenames (default: 'frame')
+            num_workers: Threads encoding and writing images while decoding goes on
+                         (default: CPU count, 0: write synchronously)
+            png_compression: PNG zlib level 0-9 (default: 1, fast with modest size growth)
+            jpeg_quality: JPEG quality 0-100 (default: 90)
+            backend: Decoder for extract_frames, 'cv2' or 'pyav' (multi-threaded FFmpeg
+                     decoding; falls back to cv2 when PyAV is not installed)
+            hwaccel: Hardware decoding for the cv2 backend: 'any', 'd3d11', 'vaapi'
+                     or 'mfx' (default: None, CPU decoding; falls back to the CPU)
         """
         self.video_path = video_path
         self.format = format.lower()
         self.prefix = prefix
+        self.num_workers = (os.cpu_count() or 1) if num_workers is None else num_workers
         
         # Validate video file exists
         if not os.path.exists(video_path):
@@ -48,6 +329,34 @@ class VideoToImages:
         # Normalize jpeg format
         if self.format == 'jpeg':
             self.format = 'jpg'
+        
+        # Output path of frame n is self._path_tmpl % n (one C-level format per frame)
+        self._path_tmpl = os.path.join(self.output_dir.replace('%', '%%'),
+                                       f"{self.prefix.replace('%', '%%')}_%06d.{self.format}")
+        
+        # Validate backend
+        if backend not in ['cv2', 'pyav']:
+            raise ValueError(f"Unsupported backend: {backend}. Use 'cv2' or 'pyav'")
+        self.backend = backend
+        
+        # Validate hardware acceleration
+        if hwaccel is not None and hwaccel not in HW_ACCELERATIONS:
+            raise ValueError(f"Unsupported hwaccel: {hwaccel}. "
+                             f"Use one of {', '.join(HW_ACCELERATIONS)}")
+        self.hwaccel = hwaccel
+        
+        # Encoder parameters passed to every cv2.imencode
+        if not 0 <= png_compression <= 9:
+            raise ValueError(f"PNG compression must be between 0 and 9, got {png_compression}")
+        if not 0 <= jpeg_quality <= 100:
+            raise ValueError(f"JPEG quality must be between 0 and 100, got {jpeg_quality}")
+        if self.format == 'png':
+            self._encode_params = [cv2.IMWRITE_PNG_COMPRESSION, png_compression]
+        else:
+            self._encode_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality,
+                                   cv2.IMWRITE_JPEG_OPTIMIZE, 0]
+        self.jpeg_quality = jpeg_quality
+        self._turbojpeg = None
     
     def extract_frames(self, start_frame: int = 0, end_frame: Optional[int] = None,
                       step: int = 1, max_frames: Optional[int] = None) -> int:
@@ -67,7 +376,7 @@ class VideoToImages:
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Open video
-        cap = cv2.VideoCapture(self.video_path)
+        cap = self._open_capture()
         if not cap.isOpened():
             raise RuntimeError(f"Failed to open video file: {self.video_path}")
         
@@ -101,48 +410,160 @@ class VideoToImages:
         print(f"  Format: {self.format}")
         print()
         
+        # cv2.imencode releases the GIL while compressing, so writer threads scale
+        writer = _FrameWriterPool(self.num_workers, f".{self.format}", self._encode_params)
+        
+        # Decode every selected frame into the same buffer; the writer pool copies
+        # only what it keeps, so there is no per-frame allocation on the decode side
+        frame_buf = np.empty((height, width, 3), dtype=np.uint8) if width and height else None
+        
+        # JPEG from PyAV: encode the decoder's YUV 4:2:0 planes directly, skipping
+        # the YUV -> BGR -> YUV round trip and moving half the bytes per frame
+        write_yuv = self._yuv_jpeg_writer(cap, width, height)
+        # PyAV returns a new array per frame, which the writers can take as-is
+        reuses_buffer = write_yuv is None and not isinstance(cap, _PyAVCapture)
+        
+        # The loop runs once per frame: bind the methods and attributes it uses
+        grab = cap.grab
+        retrieve = cap.retrieve if write_yuv is None else cap.retrieve_yuv420
+        submit = writer.submit
+        path_tmpl = self._path_tmpl
+        progress = _ProgressLine().update
+        
         try:
-            while True:
-                ret, frame = cap.read()
-                
-                if not ret:
+            # Frames before the range are only grabbed, never converted
+            while frame_count < min(start_frame, end_frame) and grab():
+                frame_count += 1
+            
+            for frame_count in range(frame_count, end_frame):
+                # Advance without decoding to BGR; only selected frames are retrieved
+                if not grab():
                     break
                 
                 # Check if we should extract this frame
-                if frame_count >= start_frame and frame_count < end_frame:
-                    if (frame_count - start_frame) % step == 0:
-                        # Check max frames limit
-                        if max_frames is not None and extracted_count >= max_frames:
-                            print(f"\nReached maximum frame limit ({max_frames})")
-                            break
-                        
-                        # Generate filename with zero-padding
-                        filename = f"{self.prefix}_{frame_count:06d}.{self.format}"
-                        output_path = os.path.join(self.output_dir, filename)
-                        
-                        # Save frame
-                        cv2.imwrite(output_path, frame)
-                        extracted_count += 1
-                        
-                        # Progress indicator
-                        if extracted_count % 10 == 0:
-                            print(f"Extracted {extracted_count} frames...", end='\r')
+                if (frame_count - start_frame) % step:
+                    continue
                 
-                frame_count += 1
+                # Check max frames limit
+                if max_frames is not None and extracted_count >= max_frames:
+                    print(f"\nReached maximum frame limit ({max_frames})")
+                    break
                 
-                # Check if we've reached the end frame
-                if frame_count >= end_frame:
+                if write_yuv is None:
+                    ret, frame_buf = retrieve(frame_buf)
+                    frame = frame_buf
+                else:
+                    ret, frame = retrieve()
+                if not ret:
                     break
+                
+                # Save frame (zero-padded filename)
+                submit(path_tmpl % frame_count, frame, write_yuv, reuses_buffer)
+                extracted_count += 1
+                
+                # Progress indicator
+                progress(extracted_count)
             
+            writer.close()
             print(f"\nExtraction complete!")
             print(f"Total frames extracted: {extracted_count}")
             print(f"Saved to: {os.path.abspath(self.output_dir)}/")
             
         finally:
             cap.release()
+            writer.close()
+        
+        return extracted_count
+    
+    def extract_frames_parallel(self, start_frame: int = 0, end_frame: Optional[int] = None,
+                                step: int = 1, num_processes: Optional[int] = None) -> int:
+        """
+        Extract frames like extract_frames, splitting the range into contiguous chunks
+        decoded by separate processes (one decoder each). Worth it for long videos in
+        seekable containers (MP4, MKV); always uses the OpenCV decoder.
+        
+        Args:
+            start_frame: Frame number to start extraction (default: 0)
+            end_frame: Frame number to end extraction (default: None, extract all)
+            step: Extract every Nth frame (default: 1, extract all frames)
+            num_processes: Decoding processes (default: half the CPU count)
+        
+        Returns:
+            Number of frames extracted
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Only the frame count is needed here, no point setting up a hardware decoder
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise RuntimeError(f"Failed to open video file: {self.video_path}")
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        
+        if end_frame is None:
+            end_frame = total_frames
+        else:
+            end_frame = min(end_frame, total_frames)
+        if num_processes is None:
+            num_processes = max(1, (os.cpu_count() or 2) // 2)
+        
+        # Chunk boundaries fall on selected frames so the step pattern is preserved
+        selected = max(0, -(-(end_frame - start_frame) // step))
+        per_chunk = -(-selected // max(num_processes, 1)) if selected else 0
+        chunks = []
+        for first in range(0, selected, per_chunk or 1):
+            chunk_start = start_frame + first * step
+            chunk_end = min(start_frame + (first + per_chunk) * step, end_frame)
+            chunks.append((self.video_path, self._path_tmpl, f".{self.format}",
+                           self._encode_params, chunk_start, chunk_end, step, self.hwaccel))
+        
+        print(f"Extracting frames {start_frame}-{end_frame} (step {step}) "
+              f"with {len(chunks)} processes to: {self.output_dir}/")
+        
+        if len(chunks) > 1:
+            with multiprocessing.Pool(len(chunks)) as pool:
+                counts = pool.starmap(_extract_chunk, chunks)
+        else:
+            counts = [_extract_chunk(*chunk) for chunk in chunks]
+        
+        extracted_count = sum(counts)
+        print("Extraction complete!")
+        print(f"Total frames extracted: {extracted_count}")
+        print(f"Saved to: {os.path.abspath(self.output_dir)}/")
         
         return extracted_count
     
+    def _open_capture(self):
+        """Open the video with the configured decoding backend."""
+        if self.backend == "pyav":
+            if av is not None:
+                return _PyAVCapture(self.video_path)
+            print("PyAV is not installed, decoding with OpenCV")
+        return _open_video_capture(self.video_path, self.hwaccel)
+    
+    def _yuv_jpeg_writer(self, cap, width: int, height: int):
+        """
+        Return a ``write(path, yuv)`` encoding I420 frames to JPEG with libjpeg-turbo,
+        or None when that path doesn't apply (PNG output, cv2 decoding, odd frame
+        size or PyTurboJPEG not installed).
+        """
+        if (self.format != 'jpg' or TurboJPEG is None or not isinstance(cap, _PyAVCapture)
+                or width % 2 or height % 2):
+            return None
+        if self._turbojpeg is None:
+            try:
+                self._turbojpeg = TurboJPEG()
+            except (OSError, RuntimeError):
+                # The Python package is there but the libturbojpeg library isn't
+                return None
+        
+        def write(path, yuv):
+            data = self._turbojpeg.encode_from_yuv(yuv, height, width, quality=self.jpeg_quality,
+                                                   jpeg_subsample=TJSAMP_420)
+            _write_file(path, data)
+        
+        return write
+    
     def extract_specific_frames(self, frame_numbers: list) -> int:
         """
         Extract specific frames by frame number.
@@ -157,7 +578,7 @@ class VideoToImages:
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Open video
-        cap = cv2.VideoCapture(self.video_path)
+        cap = _open_video_capture(self.video_path, self.hwaccel)
         if not cap.isOpened():
             raise RuntimeError(f"Failed to open video file: {self.video_path}")
         
@@ -166,6 +587,11 @@ class VideoToImages:
         print(f"Extracting {len(frame_numbers)} specific frames...")
         
         extracted_count = 0
+        writer = _FrameWriterPool(self.num_workers, f".{self.format}", self._encode_params)
+        frame_buf = None
+        progress = _ProgressLine()
+        # Index of the frame the next grab() returns
+        position = 0
         
         try:
             for frame_num in sorted(frame_numbers):
@@ -173,25 +599,37 @@ class VideoToImages:
                     print(f"Warning: Frame {frame_num} exceeds video length ({total_frames} frames)")
                     continue
                 
-                # Seek to frame
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-                ret, frame = cap.read()
+                # Each seek restarts decoding at the previous keyframe, so nearby
+                # frames are reached by grabbing forward and only far ones seek
+                gap = frame_num - position
+                if gap < 0 or gap > self.SEEK_THRESHOLD:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+                else:
+                    for _ in range(gap):
+                        if not cap.grab():
+                            break
+                position = frame_num + 1
+                
+                # Decode the requested frame
+                ret = cap.grab()
+                if ret:
+                    ret, frame_buf = cap.retrieve(frame_buf)
                 
                 if ret:
-                    filename = f"{self.prefix}_{frame_num:06d}.{self.format}"
-                    output_path = os.path.join(self.output_dir, filename)
-                    cv2.imwrite(output_path, frame)
+                    # frame_buf is decoded into again for the next frame
+                    writer.submit(self._path_tmpl % frame_num, frame_buf, copy=True)
                     extracted_count += 1
                     
-                    if extracted_count % 10 == 0:
-                        print(f"Extracted {extracted_count} frames...", end='\r')
+                    progress.update(extracted_count)
             
+            writer.close()
             print(f"\nExtraction complete!")
             print(f"Total frames extracted: {extracted_count}")
             print(f"Saved to: {os.path.abspath(self.output_dir)}/")
             
         finally:
             cap.release()
+            writer.close()
         
         return extracted_count
 
@@ -239,6 +677,18 @@ Examples:
                        help="Maximum number of frames to extract (default: no limit)")
     parser.add_argument("--frames", type=int, nargs="+",
                        help="Extract specific frame numbers")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                       help="Image writer threads (default: CPU count, 0: synchronous)")
+    parser.add_argument("--png-level", type=int, default=1,
+                       help="PNG compression level 0-9 (default: 1)")
+    parser.add_argument("--jpeg-quality", type=int, default=90,
+                       help="JPEG quality 0-100 (default: 90)")
+    parser.add_argument("--backend", choices=["cv2", "pyav"], default="cv2",
+                       help="Video decoder (default: cv2; pyav decodes on several threads)")
+    parser.add_argument("--hwaccel", choices=sorted(HW_ACCELERATIONS), default=None,
+                       help="Decode on the GPU through FFmpeg (OpenCV >= 4.5.2, falls back to CPU)")
+    parser.add_argument("--processes", type=int, default=1,
+                       help="Split the frame range across N decoding processes (default: 1)")
     
     args = parser.parse_args()
     
@@ -248,12 +698,26 @@ Examples:
             video_path=args.video,
             output_dir=args.output,
             format=args.format,
-            prefix=args.prefix
+            prefix=args.prefix,
+            num_workers=args.workers,
+            png_compression=args.png_level,
+            jpeg_quality=args.jpeg_quality,
+            backend=args.backend,
+            hwaccel=args.hwaccel
         )
         
         # Extract frames
         if args.frames:
             converter.extract_specific_frames(args.frames)
+        elif args.processes > 1:
+            if args.max is not None:
+                print("Note: --max is ignored with --processes", file=sys.stderr)
+            converter.extract_frames_parallel(
+                start_frame=args.start,
+                end_frame=args.end,
+                step=args.step,
+                num_processes=args.processes
+            )
         else:
             converter.extract_frames(
                 start_frame=args.start,
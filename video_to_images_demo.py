@@ -7,11 +7,135 @@ Creates a sample video and extracts frames from it.
 import cv2
 import numpy as np
 import os
+import argparse
 import tempfile
+from functools import lru_cache
 from video_to_images import VideoToImages
+from numba_compat import njit, prange, NUMBA_AVAILABLE
 
+try:
+    import cupy as cp  # Optional: GPU gradient for large demo videos (--backend cupy)
+except ImportError:
+    cp = None
 
-def create_animated_demo_video(filename, duration_sec=3, fps=30):
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _fill_bg_jit(frame, i, num_frames):
+    """Per-row animated gradient written straight into ``frame``, rows in parallel."""
+    height, width = frame.shape[0], frame.shape[1]
+    for y in prange(height):
+        c = int(127 + 127 * np.sin(2 * np.pi * (i / num_frames + y / height)))
+        b, g, r = c, 255 - c, (c + 128) % 255
+        for x in range(width):
+            frame[y, x, 0] = b
+            frame[y, x, 1] = g
+            frame[y, x, 2] = r
+
+
+def fill_bg(frame, i, num_frames):
+    """
+    Paint the animated gradient background of frame ``i`` into ``frame`` in place.
+    
+    Args:
+        frame: Preallocated (H, W, 3) uint8 buffer
+        i: Frame index
+        num_frames: Total number of frames in the animation
+    """
+    if NUMBA_AVAILABLE:
+        _fill_bg_jit(frame, i, num_frames)
+        return
+    
+    # Without Numba, compute one color per row and broadcast it across the width,
+    # in float64 and truncated like the kernel's int() so both paths agree exactly
+    height = frame.shape[0]
+    ys = np.arange(height)[:, None] / height
+    color = (127 + 127 * np.sin(2 * np.pi * (i / num_frames + ys))).astype(np.int64)
+    frame[:] = np.stack([color, 255 - color, (color + 128) % 255], axis=-1)
+
+
+def fill_bg_cupy(frame, i, num_frames):
+    """
+    Same as fill_bg, computed on the GPU with CuPy and copied back into ``frame``
+    (ideally page-locked, see _pinned_frame, so the device-to-host copy is a DMA).
+    """
+    height, width = frame.shape[:2]
+    ys = cp.arange(height, dtype=cp.float32)[:, None] / height
+    color = (127 + 127 * cp.sin(2 * cp.pi * (cp.float32(i / num_frames) + ys))).astype(cp.int16)
+    row_colors = cp.stack([color, 255 - color, (color + 128) % 255], axis=-1).astype(cp.uint8)
+    frame_gpu = cp.ascontiguousarray(cp.broadcast_to(row_colors, (height, width, 3)))
+    frame_gpu.get(out=frame)
+
+
+def _pinned_frame(height, width):
+    """(H, W, 3) uint8 array backed by page-locked host memory."""
+    size = height * width * 3
+    memory = cp.cuda.alloc_pinned_memory(size)
+    return np.frombuffer(memory, dtype=np.uint8, count=size).reshape(height, width, 3)
+
+
+@njit(parallel=True, cache=True)
+def _alpha_blit_jit(dst, src_rgba):
+    """Blend the premultiplied BGR of ``src_rgba`` over ``dst`` wherever its alpha is non-zero."""
+    for y in prange(src_rgba.shape[0]):
+        for x in range(src_rgba.shape[1]):
+            a = np.int32(src_rgba[y, x, 3])
+            if a != 0:
+                for c in range(3):
+                    v = src_rgba[y, x, c] + (dst[y, x, c] * (255 - a) + 127) // 255
+                    dst[y, x, c] = min(v, 255)
+
+
+def alpha_blit(dst, src_rgba):
+    """
+    Composite a BGRA tile onto a BGR region of the same size.
+    
+    Args:
+        dst: (H, W, 3) uint8 destination (may be a view into a frame)
+        src_rgba: (H, W, 4) uint8 tile drawn over transparent black, so its BGR is
+                  premultiplied and its alpha is the glyph coverage; pixels with
+                  alpha 0 are left untouched
+    """
+    if NUMBA_AVAILABLE:
+        _alpha_blit_jit(dst, src_rgba)
+    else:
+        alpha = src_rgba[:, :, 3:].astype(np.uint16)
+        blended = (dst * (255 - alpha) + 127) // 255 + src_rgba[:, :, :3]
+        np.copyto(dst, np.minimum(blended, 255), casting="unsafe")
+
+
+@lru_cache(maxsize=None)
+def _label_tile(text, font_scale, thickness, color):
+    """
+    Rasterize a static label once into a BGRA tile (treat as read-only).
+    
+    Returns:
+        (tile, top, left, advance): the tile, its offset above and left of the text
+        origin, and the horizontal advance where following text starts
+    """
+    (width, ascent), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX,
+                                                font_scale, thickness)
+    # getTextSize adds the stroke thickness to the width; putText's pen only
+    # advances by the glyphs, so the value must start that much earlier
+    advance = width - thickness
+    # Pad by the stroke thickness so no glyph edge is clipped
+    top, left = ascent + thickness, thickness
+    tile = np.zeros((top + baseline + thickness, left + width + thickness, 4), dtype=np.uint8)
+    cv2.putText(tile, text, (left, top), cv2.FONT_HERSHEY_SIMPLEX, font_scale,
+                (*color, 255), thickness)
+    return tile, top, left, advance
+
+
+def _draw_label(frame, label, value, org, font_scale, thickness, color=(255, 255, 255)):
+    """Blit the cached ``label`` at ``org`` and rasterize only ``value`` after it."""
+    tile, top, left, advance = _label_tile(label, font_scale, thickness, color)
+    x, y = org
+    region = frame[y - top:y - top + tile.shape[0], x - left:x - left + tile.shape[1]]
+    alpha_blit(region, tile[:region.shape[0], :region.shape[1]])
+    cv2.putText(frame, value, (x + advance, y), cv2.FONT_HERSHEY_SIMPLEX,
+                font_scale, color, thickness)
+
+
+def create_animated_demo_video(filename, duration_sec=3, fps=30, backend="cpu"):
     """
     Create a demo video with animated content.
     
@@ -19,9 +143,12 @@ def create_animated_demo_video(filename, duration_sec=3, fps=30):
         filename: Output video filename
         duration_sec: Video duration in seconds
         fps: Frames per second
+        backend: Background renderer, 'cpu' or 'cupy' (GPU, falls back to CPU
+                 when CuPy is not installed)
     """
     width, height = 640, 480
-    num_frames = duration_sec * fps
+    # fps may be fractional (e.g. 29.97)
+    num_frames = int(round(duration_sec * fps))
     
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     out = cv2.VideoWriter(filename, fourcc, fps, (width, height))
@@ -32,14 +159,21 @@ def create_animated_demo_video(filename, duration_sec=3, fps=30):
     print(f"  Total frames: {num_frames}")
     print()
     
+    if backend == "cupy" and cp is None:
+        print("CuPy is not installed, rendering on the CPU")
+        backend = "cpu"
+    
+    # Single frame buffer, repainted in place every iteration
+    if backend == "cupy":
+        frame = _pinned_frame(height, width)
+        paint_background = fill_bg_cupy
+    else:
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        paint_background = fill_bg
+    
     for i in range(num_frames):
-        # Create colorful animated frame
-        frame = np.zeros((height, width, 3), dtype=np.uint8)
-        
         # Animated gradient background
-        for y in range(height):
-            color_val = int(127 + 127 * np.sin(2 * np.pi * (i / num_frames + y / height)))
-            frame[y, :] = (color_val, 255 - color_val, (color_val + 128) % 255)
+        paint_background(frame, i, num_frames)
         
         # Draw moving circle
         circle_x = int(width * (0.5 + 0.3 * np.cos(2 * np.pi * i / num_frames)))
@@ -47,14 +181,9 @@ def create_animated_demo_video(filename, duration_sec=3, fps=30):
         cv2.circle(frame, (circle_x, circle_y), 40, (255, 255, 255), -1)
         cv2.circle(frame, (circle_x, circle_y), 40, (0, 0, 0), 3)
         
-        # Add frame number and timestamp
-        text = f"Frame: {i}/{num_frames}"
-        cv2.putText(frame, text, (20, 50),
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-        
-        time_text = f"Time: {i/fps:.2f}s"
-        cv2.putText(frame, time_text, (20, 100),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        # Add frame number and timestamp (static labels come from cached tiles)
+        _draw_label(frame, "Frame: ", f"{i}/{num_frames}", (20, 50), 1, 2)
+        _draw_label(frame, "Time: ", f"{i/fps:.2f}s", (20, 100), 0.8, 2)
         
         out.write(frame)
         
@@ -66,8 +195,13 @@ def create_animated_demo_video(filename, duration_sec=3, fps=30):
     print()
 
 
-def run_demo():
-    """Run the video to images demo."""
+def run_demo(backend="cpu"):
+    """
+    Run the video to images demo.
+    
+    Args:
+        backend: Background renderer for the demo video, 'cpu' or 'cupy'
+    """
     print("=" * 70)
     print("  Video to Images Converter - Demo")
     print("=" * 70)
@@ -79,7 +213,7 @@ def run_demo():
     
     # Create demo video
     video_path = os.path.join(demo_dir, "demo_video.mp4")
-    create_animated_demo_video(video_path, duration_sec=3, fps=30)
+    create_animated_demo_video(video_path, duration_sec=3, fps=30, backend=backend)
     
     # Demo 1: Extract all frames
     print("=" * 70)
@@ -158,4 +292,7 @@ def run_demo():
 
 
 if __name__ == "__main__":
-    run_demo()
+    parser = argparse.ArgumentParser(description="Video to images converter demo")
+    parser.add_argument("--backend", choices=["cpu", "cupy"], default="cpu",
+                       help="Render the demo video background on the CPU or the GPU (default: cpu)")
+    run_demo(backend=parser.parse_args().backend)